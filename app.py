@@ -1,21 +1,44 @@
 # app.py — no-scroll gallery, centered filters, best hour by city, English narrative
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import numpy as np
 import base64
+import os
+import uuid
+from datetime import timedelta
 from pathlib import Path
 
+from campaign import perf
+from campaign.cache import cache_stats, invalidate_stale, key_digest, selection_key
+from campaign.charts import GalleryData, figure_payload, gallery_for, gallery_figure
+from campaign.cube import slice_cube, totals
+from campaign.data_loader import load_memory_report, source_key
+from campaign.incremental import load_directory
+from campaign.insights import insights_for
+from campaign.prefetch import Prefetcher
+from campaign.store import load_cube
+from campaign.streaming import load_cube_streaming
+from campaign.timeseries import FREQ
+
 # =========================
 # PAGE CONFIG
 # =========================
 st.set_page_config(page_title="INFINITY Lash 3D – Marketing Dashboard", layout="wide", page_icon="👁️")
 
+# ---- performance panel: DASHBOARD_PERF=1 or ?perf=1 (hooks are no-ops otherwise)
+PERF_LOG = Path(os.environ.get("DASHBOARD_PERF_LOG", "logs/perf.jsonl"))
+perf.start(os.environ.get("DASHBOARD_PERF") == "1" or st.query_params.get("perf") == "1")
+
 # ---- paths
 LOGO_PATH = Path("assets/logo.png")
 PRODUCT_IMAGE_PATH = Path("assets/Mascara.png")
 CSV_CLEAN = Path("data/loreal_infinitylash_clean.csv")
 CSV_FALLBACK = Path("data/loreal_infinitylash.csv")
+# Partitioned drop folder (many CSVs appended over time); used instead of the single CSV when it has files
+DATA_DIR = Path(os.environ.get("DASHBOARD_DATA_DIR", "data/partitions"))
+STREAM_MB = float(os.environ.get("DASHBOARD_STREAM_MB", "512"))
+
+# ---- period presets: days back from the latest date in the data (None = no preset)
+PERIODS = {"All time": None, "Last 7 days": 7, "Last 30 days": 30, "Last 90 days": 90,
+           "Last 365 days": 365, "Custom": None}
 
 # =========================
 # UTILS
@@ -27,34 +50,6 @@ def img_to_b64(path: Path):
     except Exception:
         return None
 
-def ensure_metrics(df_: pd.DataFrame) -> pd.DataFrame:
-    req = {"Date","City","Channel","Impressions","Clicks","Spend (€)"}
-    miss = req - set(df_.columns)
-    if miss:
-        st.error(f"Missing required columns: {miss}")
-        st.stop()
-    if not pd.api.types.is_datetime64_any_dtype(df_["Date"]):
-        df_["Date"] = pd.to_datetime(df_["Date"], errors="coerce")
-
-    # Derived metrics
-    df_["CTR (%)"] = np.where(df_["Impressions"]>0, df_["Clicks"]/df_["Impressions"]*100, np.nan)
-    df_["CPC (€)"] = np.where(df_["Clicks"]>0, df_["Spend (€)"]/df_["Clicks"], np.nan)
-    df_["CPM (€)"] = np.where(df_["Impressions"]>0, df_["Spend (€)"]/df_["Impressions"]*1000, np.nan)
-
-    # Drop legacy/unused cols if present
-    DROP_COLS = ["Creative","Influencer","Likes","Shares","Saves","Comments"]
-    df_ = df_.drop(columns=[c for c in DROP_COLS if c in df_.columns], errors="ignore")
-
-    # Optional hour
-    if "Hour" in df_.columns:
-        df_["Hour"] = pd.to_numeric(df_["Hour"], errors="coerce").clip(0, 23).astype("Int64")
-
-    return df_
-
-def weighted_ctr(d: pd.DataFrame) -> float:
-    imps, clicks = d["Impressions"].sum(), d["Clicks"].sum()
-    return float(clicks / imps * 100) if imps > 0 else np.nan
-
 def fmt_int(x): 
     try: return f"{int(x):,}"
     except: return "0"
@@ -166,25 +161,46 @@ def render_hero():
     """, unsafe_allow_html=True)
 
 render_hero()
+perf.lap("hero")
 
 # =========================
 # DATA
 # =========================
-if CSV_CLEAN.exists():
-    df = pd.read_csv(CSV_CLEAN, parse_dates=["Date"])
-elif CSV_FALLBACK.exists():
-    df = pd.read_csv(CSV_FALLBACK, parse_dates=["Date"])
-else:
+# Single CSV: parsed once per file version into an on-disk array store that every worker process
+# memory-maps (zero-copy, read-only).
+# A CSV above STREAM_MB is streamed in chunks straight into the cube, never held in memory whole.
+# Partitioned folder: only rows appended since the last rerun are parsed and folded into the cube.
+# Every path publishes the City × Channel × Date × Hour cube as a memory-mapped array store; it is
+# the single source for KPIs, charts and narrative.
+csv_path = CSV_CLEAN if CSV_CLEAN.exists() else CSV_FALLBACK
+use_partitions = DATA_DIR.is_dir() and any(DATA_DIR.glob("*.csv"))
+if not use_partitions and not csv_path.exists():
     st.error("❗ CSV not found. Put your file at `data/loreal_infinitylash_clean.csv` or `data/loreal_infinitylash.csv`.")
     st.stop()
-
-df = ensure_metrics(df)
+use_streaming = not use_partitions and csv_path.stat().st_size > STREAM_MB * 2**20
+ingest_report = None
+try:
+    if use_partitions:
+        cube, cube_index, data_version = load_directory(DATA_DIR).snapshot()
+    elif use_streaming:
+        data_version = source_key(csv_path)
+        cube, cube_index, ingest_report = load_cube_streaming(csv_path)
+    else:
+        data_version = source_key(csv_path)
+        cube, cube_index = load_cube(csv_path)
+except ValueError as e:
+    st.error(str(e))
+    st.stop()
+if ingest_report is not None and ingest_report.rows_dropped:
+    st.warning(f"⚠️ Skipped malformed rows — {ingest_report.summary()}")
+invalidate_stale(data_version)  # results of older versions of this data are shared by no one any more
+perf.lap("data load")
 
 # =========================
-# FILTERS — centered, single row (Channels & Cities only)
+# FILTERS — centered, single row (Channels & Cities) + time controls
 # =========================
-channels = sorted(df["Channel"].dropna().unique())
-cities = sorted(df["City"].dropna().unique())
+channels = cube_index.values["Channel"]
+cities = cube_index.values["City"]
 
 st.markdown('<div class="filters-row">', unsafe_allow_html=True)
 fcol1, fcol2 = st.columns(2)
@@ -194,22 +210,40 @@ with fcol2:
     sel_cities = st.multiselect("Cities", cities, default=cities)
 st.markdown('</div>', unsafe_allow_html=True)
 
-# Fixed aggregation for readability
-granularity = "Daily"   # day-level
-smooth = True           # rolling smoothing
-window = 7              # 7-day rolling
-
-# Apply filters
-mask = (df["Channel"].isin(sel_channels) & df["City"].isin(sel_cities))
-fdf = df.loc[mask].copy()
+# Granularity & rolling window: served from cached prefix sums, no re-aggregation
+tcol1, tcol2, tcol3 = st.columns(3)
+with tcol1:
+    granularity = st.radio("Granularity", list(FREQ), horizontal=True)
+with tcol2:
+    window = st.slider("Rolling window (days)", min_value=1, max_value=90, value=7)
+with tcol3:
+    period = st.selectbox("Period", list(PERIODS), disabled=cube_index.span is None)
+
+# Date range: "last N days" ends on the latest date in the data; None keeps the full history
+sel_dates = None
+if cube_index.span is not None and period == "Custom":
+    first, last = (d.date() for d in cube_index.span)
+    picked = st.date_input("Date range", value=(first, last), min_value=first, max_value=last)
+    if isinstance(picked, (tuple, list)) and len(picked) == 2:  # a single date while the range is being picked
+        sel_dates = tuple(picked)
+elif cube_index.span is not None and PERIODS[period]:
+    last = cube_index.span[1].date()
+    sel_dates = (last - timedelta(days=PERIODS[period] - 1), last)
+if cube_index.covers(sel_dates):
+    sel_dates = None
+
+# Apply filters: binary search on the date order + index lookup on cube cells, no mask over raw rows
+cells = slice_cube(cube, cube_index, sel_channels, sel_cities, sel_dates)
+perf.lap("filters")
 
 # =========================
 # KPIs (centered)
 # =========================
-k_impr  = fmt_int(fdf["Impressions"].sum())
-k_clicks= fmt_int(fdf["Clicks"].sum())
-k_spend = fmt_int(fdf["Spend (€)"].sum())
-k_ctr   = fmt_float(fdf["CTR (%)"].mean(), 2)
+tot = totals(cells)
+k_impr  = fmt_int(tot["Impressions"])
+k_clicks= fmt_int(tot["Clicks"])
+k_spend = fmt_int(tot["Spend (€)"])
+k_ctr   = fmt_float(tot["Avg CTR (%)"], 2)
 
 st.markdown(f"""
 <div class="kpis-center">
@@ -219,145 +253,19 @@ st.markdown(f"""
   <div class="kpi-card"><div class="kpi-value">{k_ctr}</div><div class="kpi-label">Avg CTR (%) (filtered)</div></div>
 </div>
 """, unsafe_allow_html=True)
-
-# =========================
-# HELPERS (aggregation & axes)
-# =========================
-def aggregate(df_in: pd.DataFrame, how: str) -> pd.DataFrame:
-    """Aggregate per Channel × Date and resample to a continuous timeline. Rolling smoothing optional."""
-    if df_in.empty: return df_in
-    out = []
-    freq = {"Daily": "D", "Weekly": "W-MON", "Monthly": "MS"}[how]
-    for ch, g in df_in.groupby("Channel", dropna=True):
-        daily = (g.groupby(pd.to_datetime(g["Date"]).dt.normalize(), as_index=True)
-                   .agg({"Impressions":"sum","Clicks":"sum","Spend (€)":"sum"})
-                   .rename_axis("Date").sort_index())
-        rs = daily.resample(freq).sum().fillna(0)
-        rs["Channel"] = ch
-        rs["CTR (%)"] = np.where(rs["Impressions"]>0, rs["Clicks"]/rs["Impressions"]*100, np.nan)
-        rs["CPC (€)"] = np.where(rs["Clicks"]>0, rs["Spend (€)"]/rs["Clicks"], np.nan)
-        out.append(rs.reset_index())
-    agg_ = pd.concat(out, ignore_index=True).sort_values(["Channel","Date"])
-    if smooth and not agg_.empty:
-        for col in ["Impressions","Clicks","CTR (%)","CPC (€)"]:
-            agg_[col] = agg_.groupby("Channel", group_keys=False)[col].apply(lambda s: s.rolling(window, min_periods=1).mean())
-    return agg_
-
-def tune_time_axes(fig, yfmt=",.0f", height=440, ytitle="", y0=True, y_max=None, x_dtick="M1", x_fmt="%b %Y"):
-    fig.update_traces(mode="lines", line=dict(width=3))
-    fig.update_layout(template="plotly_white", height=height,
-                      margin=dict(l=12, r=12, t=56, b=8),
-                      legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5),
-                      hovermode=False, yaxis_title=ytitle)
-    fig.update_yaxes(tickformat=yfmt, showgrid=True, gridwidth=1, gridcolor="rgba(0,0,0,0.10)",
-                     zeroline=False, ticks="outside", ticklen=6,
-                     rangemode="tozero" if y0 else None,
-                     range=[0, y_max] if y_max is not None else None)
-    fig.update_xaxes(showgrid=True, gridwidth=1, gridcolor="rgba(0,0,0,0.08)",
-                     ticks="outside", ticklen=6, tickangle=0,
-                     dtick=x_dtick, tickformat=x_fmt)
-    return fig
-
-def choose_dtick_and_fmt(d1, d2, gran):
-    days = (pd.to_datetime(d2) - pd.to_datetime(d1)).days + 1
-    if gran == "Daily":
-        if days <= 31:  return "D1", "%d %b"
-        if days <= 120: return "M1", "%b %Y"
-        return "M2", "%b %Y"
-    if gran == "Weekly":
-        if days <= 90:  return "W1", "%d %b"
-        return "M1", "%b %Y"
-    return "M1", "%b %Y"
+perf.lap("kpis")
 
 # =========================
 # GRAPH GALLERY — no-scroll (arrow navigation)
 # =========================
 st.markdown('<div class="section-title">📈 Key Charts</div>', unsafe_allow_html=True)
 
-# 1) Aggregate & ticks
-agg = aggregate(fdf, "Daily")
-x_dtick, x_fmt = choose_dtick_and_fmt(fdf["Date"].min(), fdf["Date"].max(), "Daily")
-
-# 2) Build figures (same height)
-GALLERY_HEIGHT = 420
-
-def make_time_fig(y, yfmt, ytitle):
-    fig = px.line(agg, x="Date", y=y, color="Channel", title=None)
-    fig.update_layout(title=dict(text=ytitle, x=0.01, y=0.98, xanchor="left", font=dict(size=16)))
-    return tune_time_axes(fig, yfmt=yfmt, height=GALLERY_HEIGHT, ytitle=ytitle,
-                          y0=True,
-                          y_max=float(agg[y].max()*1.12) if not agg.empty else None,
-                          x_dtick=x_dtick, x_fmt=x_fmt)
-
-def make_city_ctr_fig():
-    city_ctr = (fdf.groupby("City").apply(weighted_ctr)
-                .reset_index(name="CTR (%)").sort_values("CTR (%)", ascending=False))
-    fig = px.bar(city_ctr, x="City", y="CTR (%)",
-                 text=city_ctr["CTR (%)"].map(lambda v: f"{v:.2f}%"), title=None)
-    fig.update_traces(textposition="outside", cliponaxis=False)
-    fig.update_layout(template="plotly_white", height=GALLERY_HEIGHT,
-                      margin=dict(l=12, r=12, t=56, b=8),
-                      title=dict(text="CTR (%) by City (weighted)", x=0.01, y=0.98, xanchor="left", font=dict(size=16)),
-                      hovermode=False, yaxis_title="CTR (%)")
-    fig.update_yaxes(tickformat=".2f",
-                     range=[0, float(city_ctr["CTR (%)"].max()*1.2) if not city_ctr.empty else None],
-                     showgrid=True, gridcolor="rgba(0,0,0,0.10)")
-    return fig
-
-def make_city_clicks_fig():
-    city_channel = fdf.groupby(["City", "Channel"], as_index=False)[["Clicks"]].sum()
-    fig = px.bar(city_channel, x="City", y="Clicks", color="Channel", barmode="stack", title=None)
-    fig.update_layout(template="plotly_white", height=GALLERY_HEIGHT,
-                      margin=dict(l=12, r=12, t=56, b=8),
-                      title=dict(text="Clicks by City & Channel", x=0.01, y=0.98, xanchor="left", font=dict(size=16)),
-                      hovermode=False, yaxis_title="Clicks")
-    fig.update_yaxes(tickformat=",.0f",
-                     range=[0, float(city_channel["Clicks"].max()*1.15) if not city_channel.empty else None],
-                     showgrid=True, gridcolor="rgba(0,0,0,0.10)")
-    return fig
-
-def make_best_hour_by_city_fig():
-    if "Hour" not in fdf.columns or fdf.dropna(subset=["Hour"]).empty:
-        return None
-    fdf_h = fdf.dropna(subset=["Hour"]).copy()
-    fdf_h["Hour"] = fdf_h["Hour"].astype(int)
-
-    def w_ctr(df_):
-        imps, clk = df_["Impressions"].sum(), df_["Clicks"].sum()
-        return float(clk/imps*100) if imps>0 else np.nan
-
-    city_hour_ctr = fdf_h.groupby(["City","Hour"]).apply(w_ctr).reset_index(name="CTR (%)")
-    best_hour = (city_hour_ctr.sort_values(["City","CTR (%)"], ascending=[True,False])
-                 .groupby("City").head(1).sort_values("CTR (%)", ascending=False))
+# 1) Lazy registry: only the chart on screen is built, memoized per selection
+sel_key = selection_key(data_version, sel_channels, sel_cities, sel_dates)
+gallery_data = GalleryData(cells, sel_key, granularity, window)
+gallery = gallery_for(gallery_data)
 
-    fig = px.bar(
-        best_hour, x="City", y="CTR (%)",
-        text=best_hour.apply(lambda r: f"{int(r['Hour']):02d}:00", axis=1),
-        title=None
-    )
-    fig.update_traces(textposition="outside", showlegend=False, cliponaxis=False)
-    fig.update_layout(template="plotly_white", height=GALLERY_HEIGHT,
-                      margin=dict(l=12, r=12, t=56, b=8),
-                      title=dict(text="Best Hour by City (highest CTR)", x=0.01, y=0.98, xanchor="left", font=dict(size=16)),
-                      hovermode=False, yaxis_title="CTR (%)")
-    fig.update_yaxes(tickformat=".2f",
-                     range=[0, float(best_hour["CTR (%)"].max()*1.2) if not best_hour.empty else None],
-                     showgrid=True, gridcolor="rgba(0,0,0,0.10)")
-    return fig
-
-gallery = [
-    ("Impressions by Channel (Daily + 7-day rolling)", make_time_fig("Impressions", ",.0f", "Impressions")),
-    ("Clicks by Channel (Daily + 7-day rolling)",      make_time_fig("Clicks", ",.0f", "Clicks")),
-    ("CTR (%) by Channel (Daily + 7-day rolling)",     make_time_fig("CTR (%)", ".2f", "CTR (%)")),
-    ("CPC (€) by Channel (Daily + 7-day rolling)",     make_time_fig("CPC (€)", ",.2f", "CPC (€)")),
-    ("CTR (%) by City (weighted)",                     make_city_ctr_fig()),
-    ("Clicks by City & Channel",                       make_city_clicks_fig()),
-]
-best_hour_fig = make_best_hour_by_city_fig()
-if best_hour_fig is not None:
-    gallery.append(("Best Hour by City (highest CTR)", best_hour_fig))
-
-# 3) Gallery index + navigation buttons
+# 2) Gallery index + navigation buttons
 if "gallery_idx" not in st.session_state:
     st.session_state.gallery_idx = 0
 
@@ -372,16 +280,27 @@ with c_prev:
 with c_next:
     st.button("Next ▶︎", on_click=nav, args=(+1,), use_container_width=True)
 
-title, fig = gallery[st.session_state.gallery_idx]
+st.session_state.gallery_idx %= len(gallery)
+chart = gallery[st.session_state.gallery_idx]
+if "prefetcher" not in st.session_state:
+    st.session_state.prefetcher = Prefetcher()
+st.session_state.prefetcher.retarget(gallery_data)  # filters changed: drop queued work before this chart builds
+title, fig = chart[1], gallery_figure(chart, gallery_data)
 with c_title:
     st.markdown(f"<div class='gallery-title'>{title}</div>", unsafe_allow_html=True)
     dots = []
     for i in range(len(gallery)):
         dots.append("●" if i == st.session_state.gallery_idx else "○")
     st.markdown(f"<div class='gallery-dots'>{' '.join(dots)}</div>", unsafe_allow_html=True)
+perf.lap("gallery")
 
 # Single chart (constant height to avoid scroll)
 st.plotly_chart(fig, use_container_width=True, config={"staticPlot": True, "displaylogo": False})
+perf.lap("plotly_chart")
+
+# Build Prev/Next neighbours and the narrative in the background once this chart is out,
+# so the prefetch threads never compete with it for the GIL
+st.session_state.prefetcher.schedule(gallery_data, gallery, st.session_state.gallery_idx)
 
 st.divider()
 
@@ -390,87 +309,31 @@ st.divider()
 # =========================
 st.subheader("🔎 Insights & Recommendations — Based on current filters")
 
-def text_insights_en(df: pd.DataFrame) -> str:
-    if df.empty:
-        return "_No data for the selected filters._"
-
-    # Totals
-    tot_impr = int(df["Impressions"].sum())
-    tot_clk  = int(df["Clicks"].sum())
-    tot_spend= float(df["Spend (€)"].sum())
-    ctr_g    = (tot_clk / tot_impr * 100) if tot_impr > 0 else float("nan")
-    cpc_g    = (tot_spend / tot_clk) if tot_clk > 0 else float("nan")
-    cpm_g    = (tot_spend / tot_impr * 1000) if tot_impr > 0 else float("nan")
-
-    # By channel
-    ch = df.groupby("Channel", dropna=True).agg(
-        Impressions=("Impressions","sum"),
-        Clicks=("Clicks","sum"),
-        Spend=("Spend (€)","sum")).reset_index()
-    ch["CTR (%)"] = np.where(ch["Impressions"]>0, ch["Clicks"]/ch["Impressions"]*100, np.nan)
-    ch["CPC (€)"] = np.where(ch["Clicks"]>0, ch["Spend"]/ch["Clicks"], np.nan)
-    ch["CPM (€)"] = np.where(ch["Impressions"]>0, ch["Spend"]/ch["Impressions"]*1000, np.nan)
-
-    best_ctr = ch.sort_values("CTR (%)", ascending=False).iloc[0] if not ch.empty else None
-    best_cpc = ch.sort_values("CPC (€)", ascending=True).iloc[0] if not ch.empty else None
-    best_cpm = ch.sort_values("CPM (€)", ascending=True).iloc[0] if not ch.empty else None
-
-    # By city
-    city = df.groupby("City", dropna=True).agg(
-        Impressions=("Impressions","sum"),
-        Clicks=("Clicks","sum"),
-        Spend=("Spend (€)","sum")).reset_index()
-    city["CTR (%)"] = np.where(city["Impressions"]>0, city["Clicks"]/city["Impressions"]*100, np.nan)
-    city["CPC (€)"] = np.where(city["Clicks"]>0, city["Spend"]/city["Clicks"], np.nan)
-
-    top_city_ctr = city.sort_values("CTR (%)", ascending=False).iloc[0] if not city.empty else None
-    best_city_cpc= city.sort_values("CPC (€)", ascending=True).iloc[0] if not city.empty else None
-
-    # City × Channel winners (highest CTR)
-    cc = df.groupby(["City","Channel"], dropna=True).agg(
-        Impressions=("Impressions","sum"), Clicks=("Clicks","sum")).reset_index()
-    cc["CTR (%)"] = np.where(cc["Impressions"]>0, cc["Clicks"]/cc["Impressions"]*100, np.nan)
-    winners = (cc.sort_values(["City","CTR (%)"], ascending=[True,False]).groupby("City").head(1)
-               if not cc.empty else pd.DataFrame(columns=["City","Channel","CTR (%)"]))
-
-    # Best hour (if available)
-    hour_lines = []
-    if "Hour" in df.columns and not df.dropna(subset=["Hour"]).empty:
-        df_h = df.dropna(subset=["Hour"]).copy()
-        df_h["Hour"] = df_h["Hour"].astype(int)
-        city_hour = df_h.groupby(["City","Hour"]).agg(Impressions=("Impressions","sum"), Clicks=("Clicks","sum")).reset_index()
-        city_hour["CTR (%)"] = np.where(city_hour["Impressions"]>0, city_hour["Clicks"]/city_hour["Impressions"]*100, np.nan)
-        best_hour = (city_hour.sort_values(["City","CTR (%)"], ascending=[True,False]).groupby("City").head(1))
-        for _, r in best_hour.iterrows():
-            hour_lines.append(f"- **{r['City']}**: best around **{int(r['Hour']):02d}:00** (CTR **{r['CTR (%)']:.2f}%**).")
-
-    # Helpers
-    pct = lambda x: "—" if pd.isna(x) else f"{x:.2f}%"
-    eur = lambda x: "—" if pd.isna(x) else f"{x:,.2f}€"
-    i   = lambda x: f"{int(x):,}"
-
-    lines = []
-    lines.append(f"**Overall.** {i(tot_impr)} impressions, {i(tot_clk)} clicks → **CTR {pct(ctr_g)}**, **CPC {eur(cpc_g)}**, **CPM {eur(cpm_g)}**.")
-    if best_ctr is not None and best_cpc is not None and best_cpm is not None:
-        lines.append(f"**By channel.** Highest CTR on **{best_ctr['Channel']}** ({pct(best_ctr['CTR (%)'])}); "
-                     f"lowest CPC on **{best_cpc['Channel']}** ({eur(best_cpc['CPC (€)'])}); "
-                     f"lowest CPM on **{best_cpm['Channel']}** ({eur(best_cpm['CPM (€)'])}).")
-    bits = []
-    if top_city_ctr is not None: bits.append(f"top CTR in **{top_city_ctr['City']}** ({pct(top_city_ctr['CTR (%)'])})")
-    if best_city_cpc is not None: bits.append(f"lowest CPC in **{best_city_cpc['City']}** ({eur(best_city_cpc['CPC (€)'])})")
-    if bits: lines.append("**By city.** " + " · ".join(bits) + ".")
-    if not winners.empty:
-        bullets = [f"- **{r.City}** → best channel: **{r.Channel}** ({pct(r['CTR (%)'])})" for _, r in winners.iterrows()]
-        lines.append("**City × channel winners:**\n" + "\n".join(bullets))
-    if hour_lines:
-        lines.append("**Best hours to schedule:**\n" + "\n".join(hour_lines))
-    tips = []
-    if best_ctr is not None and best_cpc is not None:
-        tips.append(f"Shift incremental budget to **{best_ctr['Channel']}** (highest CTR) and **{best_cpc['Channel']}** (lowest CPC) in winning cities.")
-    if not winners.empty:
-        tips.append("Scale the city–channel pairs listed above to maximize clicks at the lowest cost.")
-    tips.append("Reduce or test new creatives/targeting where CTR is low and CPC/CPM are high.")
-    lines.append("**Recommendations.** " + " ".join(tips))
-    return "\n\n".join(lines)
-
-st.markdown(text_insights_en(fdf))
+st.markdown(insights_for(sel_key, cells))
+perf.lap("narrative")
+
+# Compact schema footprint, recorded when the current data version was ingested
+mem_report = None if use_partitions or use_streaming else load_memory_report(csv_path)
+if mem_report is not None:
+    with st.expander("🧠 Memory usage — campaign frame (bytes per column)"):
+        st.dataframe(mem_report, use_container_width=True)
+
+# =========================
+# PERFORMANCE PANEL (optional)
+# =========================
+rec = perf.current()
+if rec is not None:
+    perf.lap("memory report")
+    if "perf_session" not in st.session_state:
+        st.session_state.perf_session = uuid.uuid4().hex[:12]
+    payload = figure_payload(fig)
+    perf.append_jsonl(PERF_LOG, rec.to_record(
+        session=st.session_state.perf_session, chart=chart[0], selection=key_digest(sel_key), payload_bytes=payload,
+        channels=list(sel_channels), cities=list(sel_cities), granularity=granularity, window=window))
+    with st.expander(f"⏱️ Performance — this rerun: {rec.total_ms:,.0f} ms"):
+        st.caption("Script stages in order; aggregate/figure/narrative/ingest run inside the stage that triggered them. "
+                   f"Every rerun is appended to `{PERF_LOG}`. Chart payload: {payload / 1024:,.0f} KiB.")
+        st.dataframe({"stage": list(rec.stages), "ms": [round(v, 1) for v in rec.stages.values()]},
+                     use_container_width=True)
+        st.markdown("**Cache hits / misses (this rerun)** — " + (", ".join(f"{k}: {v}" for k, v in sorted(rec.cache.items())) or "none"))
+        st.dataframe({name: stats for name, stats in cache_stats().items()}, use_container_width=True)
@@ -0,0 +1 @@
+"""Computation layer of the INFINITY Lash 3D dashboard (no Streamlit imports)."""
@@ -0,0 +1,169 @@
+"""Headless batch reports: KPIs, narrative and charts for every filter combination.
+
+The data is loaded and reduced to the metrics cube once in the parent process, which writes it
+to the array store (``campaign.store``); like the dashboard, a partitioned data directory with
+CSVs (``DASHBOARD_DATA_DIR``) is preferred over the single CSV. Workers of a process pool memory-map that store in
+their initializer instead of receiving a pickled copy, and render combinations in parallel:
+
+    python -m campaign.batch_report --out reports/2025-01-31
+    python -m campaign.batch_report --combo "TikTok,YouTube:Paris" --combo "*:London" --images
+"""
+import argparse
+import json
+import logging
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import combinations
+from pathlib import Path
+
+import pandas as pd
+
+from campaign.cache import selection_key
+from campaign.charts import GalleryData, gallery_for
+from campaign.cube import slice_cube, totals
+from campaign.data_loader import source_key
+from campaign.incremental import load_directory
+from campaign.insights import text_insights_en
+from campaign.store import ensure_store, open_store
+from campaign.timeseries import FREQ
+
+log = logging.getLogger(__name__)
+
+DEFAULT_SOURCES = [Path("data/loreal_infinitylash_clean.csv"), Path("data/loreal_infinitylash.csv")]
+DEFAULT_DATA_DIR = Path(os.environ.get("DASHBOARD_DATA_DIR", "data/partitions"))
+
+_worker = {}                    # per-process state set by _init_worker
+
+
+# =========================
+# COMBINATIONS
+# =========================
+def _subsets(values: list) -> list:
+    return [list(c) for k in range(1, len(values) + 1) for c in combinations(values, k)]
+
+def all_combos(channels: list, cities: list) -> list:
+    """Every (non-empty channel subset, non-empty city subset) pair."""
+    return [(ch, ci) for ch in _subsets(channels) for ci in _subsets(cities)]
+
+def parse_combo(spec: str, channels: list, cities: list) -> tuple:
+    """``"TikTok,YouTube:Paris"`` -> (channels, cities); ``*`` selects every value."""
+    ch_spec, _, ci_spec = spec.partition(":")
+    def pick(part, values, what):
+        if part.strip() in ("", "*"):
+            return list(values)
+        chosen = [v.strip() for v in part.split(",") if v.strip()]
+        unknown = set(chosen) - set(values)
+        if unknown:
+            raise ValueError(f"Unknown {what} in --combo {spec!r}: {sorted(unknown)}")
+        return chosen
+    return pick(ch_spec, channels, "channels"), pick(ci_spec, cities, "cities")
+
+def combo_slug(channels: list, cities: list) -> str:
+    clean = lambda vals: "+".join(re.sub(r"[^A-Za-z0-9]+", "-", v).strip("-") for v in vals)
+    return f"ch_{clean(channels)}__city_{clean(cities)}"
+
+
+# =========================
+# WORKER
+# =========================
+def _init_worker(store_dir, version, granularity, window_days, images):
+    cube, index = open_store(store_dir)  # memory-mapped: workers share one copy of the cube
+    _worker.update(cube=cube, index=index, version=version, granularity=granularity,
+                   window_days=window_days, images=images)
+
+def render_combo(channels: list, cities: list, out_dir: Path) -> dict:
+    """Write kpis.json, narrative.md and charts/<id>.json (+ .png with --images) for one combination."""
+    t0 = time.perf_counter()
+    w = _worker
+    cells = slice_cube(w["cube"], w["index"], channels, cities)
+    target = out_dir / combo_slug(channels, cities)
+    (target / "charts").mkdir(parents=True, exist_ok=True)
+
+    tot = totals(cells)
+    kpis = {"channels": channels, "cities": cities,
+            "impressions": int(tot["Impressions"]), "clicks": int(tot["Clicks"]),
+            "spend_eur": round(float(tot["Spend (€)"]), 2),
+            "avg_ctr_pct": None if pd.isna(tot["Avg CTR (%)"]) else round(float(tot["Avg CTR (%)"]), 4)}
+    (target / "kpis.json").write_text(json.dumps(kpis, indent=1))
+
+    head = f"# Channels: {', '.join(channels)} · Cities: {', '.join(cities)}\n\n"
+    (target / "narrative.md").write_text(head + text_insights_en(cells) + "\n", encoding="utf-8")
+
+    charts, image_error = [], None
+    if not cells.empty:
+        data = GalleryData(cells, selection_key(w["version"], channels, cities), w["granularity"], w["window_days"])
+        for chart_id, title, build in gallery_for(data):
+            fig = build(data)
+            (target / "charts" / f"{chart_id}.json").write_text(fig.to_json())
+            if w["images"] and image_error is None:
+                try:
+                    fig.write_image(target / "charts" / f"{chart_id}.png")
+                except (ImportError, ValueError) as e:  # kaleido is optional
+                    image_error = str(e)
+            charts.append({"id": chart_id, "title": title})
+    return {"dir": target.name, "channels": channels, "cities": cities, "charts": charts,
+            "seconds": round(time.perf_counter() - t0, 4), "image_error": image_error}
+
+
+# =========================
+# CLI
+# =========================
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--csv", type=Path, default=None,
+                    help="source CSV (default: same as the dashboard, i.e. --data-dir if it has CSVs)")
+    ap.add_argument("--data-dir", type=Path, default=DEFAULT_DATA_DIR,
+                    help="partitioned data directory (default: $DASHBOARD_DATA_DIR or data/partitions)")
+    ap.add_argument("--out", type=Path, default=Path("reports"))
+    ap.add_argument("--combo", action="append", default=[], metavar="CHANNELS:CITIES",
+                    help='e.g. "TikTok,YouTube:Paris" or "*:London"; repeatable (default: every combination)')
+    ap.add_argument("--granularity", choices=list(FREQ), default="Daily")
+    ap.add_argument("--window", type=int, default=7, help="rolling window in days")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--images", action="store_true", help="also write PNG charts (needs kaleido)")
+    args = ap.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    use_partitions = args.csv is None and args.data_dir.is_dir() and any(args.data_dir.glob("*.csv"))
+    # Shared work, done once: parse/enrich, cube and filter index, published as an array store
+    t0 = time.perf_counter()
+    if use_partitions:
+        dataset = load_directory(args.data_dir)
+        source, store_dir, version = args.data_dir, dataset.store_dir, dataset.snapshot()[2]
+        if store_dir is None:
+            ap.error(f"no rows in {args.data_dir}")
+    else:
+        source = args.csv or next((p for p in DEFAULT_SOURCES if p.exists()), DEFAULT_SOURCES[-1])
+        version = source_key(source)
+        store_dir = ensure_store(source)
+    cube, index = open_store(store_dir)
+    channels, cities = index.values["Channel"], index.values["City"]
+    combos = ([parse_combo(s, channels, cities) for s in args.combo] if args.combo
+              else all_combos(channels, cities))
+    log.info("Loaded %s (%d cube cells) in %.2fs; rendering %d combinations on %d workers",
+             source, len(cube), time.perf_counter() - t0, len(combos), args.workers)
+
+    args.out.mkdir(parents=True, exist_ok=True)
+    results = []
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker,
+                             initargs=(store_dir, version, args.granularity, args.window, args.images)) as pool:
+        futures = [pool.submit(render_combo, ch, ci, args.out) for ch, ci in combos]
+        for n, fut in enumerate(as_completed(futures), 1):
+            res = fut.result()
+            results.append(res)
+            log.info("[%d/%d] %s (%.2fs)", n, len(combos), res["dir"], res["seconds"])
+
+    errors = {r["image_error"] for r in results if r["image_error"]}
+    for err in errors:
+        log.warning("PNG export skipped: %s", err)
+    manifest = {"source": str(source), "granularity": args.granularity, "window_days": args.window,
+                "combinations": sorted(results, key=lambda r: r["dir"])}
+    (args.out / "index.json").write_text(json.dumps(manifest, indent=1))
+    log.info("Wrote %d reports to %s in %.2fs", len(results), args.out, time.perf_counter() - t0)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
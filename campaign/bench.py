@@ -0,0 +1,200 @@
+"""Headless benchmark of the dashboard pipeline on deterministic synthetic campaign data.
+
+Times every stage the app runs on a rerun (load, ensure_metrics, cube, filtering, aggregation,
+each gallery builder, narrative) for growing row counts, and writes wall time and peak traced
+memory per stage, plus the figure JSON size with and without downsampling, to a JSON file so
+runs of different versions can be compared:
+
+    python -m campaign.bench --rows 1000 100000 1000000 --cities 5 --channels 4 --out bench_results.json
+"""
+import argparse
+import json
+import platform
+import shutil
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+import campaign.data_loader as data_loader
+import campaign.store as store
+from campaign.charts import GalleryData, figure_payload, gallery_for
+from campaign.cube import build_cube, slice_cube
+from campaign.filter_index import FilterIndex
+from campaign.insights import text_insights_en
+
+CITY_NAMES = ["Paris", "London", "New York"]
+CHANNEL_NAMES = ["Instagram", "TikTok", "YouTube"]
+
+
+# =========================
+# SYNTHETIC DATA
+# =========================
+def _names(base: list, n: int, prefix: str) -> list:
+    return base[:n] + [f"{prefix} {i:02d}" for i in range(len(base) + 1, n + 1)]
+
+def synthetic_campaign(n_rows: int, n_cities: int = 3, n_channels: int = 3,
+                       days: int = 365, seed: int = 0) -> pd.DataFrame:
+    """Random rows with the schema of ``data/loreal_infinitylash.csv``; same arguments, same frame."""
+    rng = np.random.default_rng(seed)
+    cities, channels = _names(CITY_NAMES, n_cities, "City"), _names(CHANNEL_NAMES, n_channels, "Channel")
+    ch = rng.integers(0, n_channels, n_rows)
+    ch_ctr = rng.uniform(0.01, 0.04, n_channels)        # each channel has its own typical CTR / CPM
+    ch_cpm = rng.uniform(6.0, 14.0, n_channels)
+    impressions = rng.integers(5_000, 25_000, n_rows)
+    clicks = rng.binomial(impressions, ch_ctr[ch])
+    spend = np.round(impressions * ch_cpm[ch] / 1000 * rng.uniform(0.8, 1.2, n_rows), 2)
+    df = pd.DataFrame({
+        "Date": (pd.Timestamp("2025-01-01") + pd.to_timedelta(rng.integers(0, days, n_rows), unit="D")).strftime("%Y-%m-%d"),
+        "City": np.asarray(cities, dtype=object)[rng.integers(0, n_cities, n_rows)],
+        "Channel": np.asarray(channels, dtype=object)[ch],
+        "Hour": rng.integers(0, 24, n_rows),
+        "Impressions": impressions,
+        "Clicks": clicks,
+        "Spend (€)": spend,
+    })
+    df["CTR (%)"] = np.round(clicks / impressions * 100, 4)
+    df["CPC (€)"] = np.round(np.where(clicks > 0, spend / np.maximum(clicks, 1), np.nan), 4)
+    return df.sort_values(["Date", "City", "Channel"], kind="stable", ignore_index=True)
+
+
+# =========================
+# MEASUREMENT
+# =========================
+def measure(fn, repeat: int = 1, trace: bool = True):
+    """(best wall time in s, peak traced bytes or None, result) of calling `fn`."""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    peak = None
+    if trace:  # separate traced call: tracemalloc overhead must not leak into the timings
+        tracemalloc.start()
+        try:
+            fn()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return best, peak, result
+
+
+def run_pipeline(csv_path: Path, cache_dir: Path, repeat: int = 1, trace: bool = True) -> list:
+    """Run every stage once on `csv_path` and return one record per stage."""
+    records, state = [], {}
+
+    def stage(name, fn):
+        seconds, peak, state[name] = measure(fn, repeat, trace)
+        records.append({"stage": name, "seconds": round(seconds, 6), "peak_bytes": peak})
+
+    def load_cold():
+        data_loader._FRAMES.clear()
+        for f in cache_dir.glob("*"):
+            f.unlink()
+        return data_loader.load_campaign(csv_path, cache_dir)
+
+    def load_warm():  # Parquet cache hit in a fresh process
+        data_loader._FRAMES.clear()
+        return data_loader.load_campaign(csv_path, cache_dir)
+
+    stage("read_csv", lambda: pd.read_csv(csv_path, parse_dates=["Date"]))
+    stage("ensure_metrics", lambda: data_loader.apply_schema(data_loader.ensure_metrics(state["read_csv"].copy())))
+    stage("load_cold", load_cold)
+    stage("load_warm", load_warm)
+
+    def store_cold():  # build the memory-mapped array store from the warm Parquet cache
+        shutil.rmtree(cache_dir / "store", ignore_errors=True)
+        return store.ensure_store(csv_path, cache_dir)
+
+    stage("store_cold", store_cold)
+    stage("store_open", lambda: store.open_store(state["store_cold"]))  # what each extra worker pays
+    df = state["load_warm"]
+    stage("build_cube", lambda: build_cube(df))
+    cube = state["build_cube"]
+    stage("filter_index", lambda: FilterIndex(cube))
+    index = state["filter_index"]
+    channels, cities = index.values["Channel"], index.values["City"]
+    sel_channels, sel_cities = channels[: max(1, len(channels) // 2 + 1)], cities[: max(1, len(cities) // 2 + 1)]
+    stage("filter", lambda: slice_cube(cube, index, sel_channels, sel_cities))
+    cells = state["filter"]
+    if index.span is not None:  # the analysts' usual view: the last 30 days of the history
+        last_30 = (index.span[1] - pd.Timedelta(days=29), index.span[1])
+        stage("filter_30d", lambda: slice_cube(cube, index, sel_channels, sel_cities, last_30))
+
+    # object() keys never hit the memo caches, so each call really computes
+    stage("aggregate", lambda: GalleryData(cells, (object(),)).agg)
+    data = GalleryData(cells, (object(),))
+    data.agg  # builders below are timed without the shared aggregation
+    full = GalleryData(cells, (object(),), max_points=0)  # same charts without downsampling
+    full.agg
+    for chart_id, _, build in gallery_for(data):
+        stage(f"fig:{chart_id}", lambda build=build: build(data))
+        fig = state[f"fig:{chart_id}"]
+        if fig is not None:  # JSON bytes sent to the browser, with and without downsampling
+            records[-1].update(payload_bytes=figure_payload(fig), payload_bytes_full=figure_payload(build(full)))
+    stage("text_insights_en", lambda: text_insights_en(cells))
+    for r in records:
+        r["cells"] = len(cells)
+    return records
+
+
+def _git_rev() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=Path(__file__).resolve().parent, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--rows", type=float, nargs="+", default=[1e3, 1e4, 1e5, 1e6],
+                    help="row counts to benchmark (1e3 … 1e7)")
+    ap.add_argument("--cities", type=int, default=3)
+    ap.add_argument("--channels", type=int, default=3)
+    ap.add_argument("--days", type=int, default=365)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--repeat", type=int, default=1, help="timed calls per stage (best is kept)")
+    ap.add_argument("--no-memory", action="store_true", help="skip the traced peak-memory call")
+    ap.add_argument("--out", type=Path, default=Path("bench_results.json"))
+    args = ap.parse_args(argv)
+
+    px.line(pd.DataFrame({"x": [0], "y": [0]}), x="x", y="y")  # warm Plotly's lazy imports outside the timings
+    results = []
+    with tempfile.TemporaryDirectory(prefix="campaign-bench-") as tmp:
+        tmp = Path(tmp)
+        for n in map(int, args.rows):
+            csv_path = tmp / f"synthetic_{n}.csv"
+            synthetic_campaign(n, args.cities, args.channels, args.days, args.seed).to_csv(csv_path, index=False)
+            cache_dir = tmp / f"cache_{n}"
+            cache_dir.mkdir()
+            for r in run_pipeline(csv_path, cache_dir, args.repeat, not args.no_memory):
+                results.append({"rows": n, **r})
+                peak = "" if r["peak_bytes"] is None else f"{r['peak_bytes'] / 2**20:10.1f} MiB"
+                payload = (f"  {r['payload_bytes_full'] / 1024:,.0f} → {r['payload_bytes'] / 1024:,.0f} KiB"
+                           if "payload_bytes" in r else "")
+                print(f"{n:>10,}  {r['stage']:<18} {r['seconds'] * 1000:10.1f} ms  {peak}{payload}")
+            csv_path.unlink()
+
+    meta = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_rev": _git_rev(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "machine": platform.platform(),
+        "params": {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()},
+    }
+    args.out.write_text(json.dumps({"meta": meta, "results": results}, indent=1))
+    print(f"Wrote {len(results)} records to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,165 @@
+"""Process-wide memo caches shared by every Streamlit session.
+
+All named caches share one memory budget (``CACHE_MB``) with least-recently-used eviction
+across caches, plus an optional time-to-live. Entries are tagged with the data version they
+were computed from, so a new version of a source drops the old results. Concurrent misses on
+the same key are single-flight: one session builds, the others wait for its result.
+"""
+import hashlib
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import numpy as np
+import pandas as pd
+
+from campaign import perf
+
+CACHE_MB = float(os.environ.get("DASHBOARD_CACHE_MB", "256"))       # shared by every cache
+CACHE_TTL = float(os.environ.get("DASHBOARD_CACHE_TTL", "3600")) or None  # seconds; 0 = never expire
+
+CACHES: dict = {}               # name -> cache, for hit/miss reporting
+_LOCK = threading.Lock()        # guards every cache: eviction is global
+
+
+def selection_key(version: tuple, channels, cities, dates=None) -> tuple:
+    """Canonical key of a filter selection; list order and duplicates don't matter."""
+    return (version, tuple(sorted(set(channels))), tuple(sorted(set(cities))),
+            tuple(str(d) for d in dates) if dates else None)
+
+
+def key_digest(key) -> str:
+    """Stable short hash of a cache key (e.g. for file names or logs)."""
+    return hashlib.sha1(repr(key).encode()).hexdigest()[:16]
+
+
+def approx_size(obj, _depth: int = 0) -> int:
+    """Approximate deep size in bytes of a cached value (frames, arrays, figures, plain objects)."""
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(index=True, deep=True))
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if _depth > 8 or isinstance(obj, (str, bytes, int, float, bool, type(None))):
+        return sys.getsizeof(obj)
+    if hasattr(obj, "to_plotly_json"):  # plotly figures
+        return approx_size(obj.to_plotly_json(), _depth + 1)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(approx_size(k, _depth + 1) + approx_size(v, _depth + 1) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return sys.getsizeof(obj) + sum(approx_size(v, _depth + 1) for v in obj)
+    if hasattr(obj, "__dict__"):
+        return sys.getsizeof(obj) + approx_size(vars(obj), _depth + 1)
+    return sys.getsizeof(obj)
+
+
+class _Entry:
+    __slots__ = ("value", "nbytes", "version", "expires", "used")
+
+    def __init__(self, value, nbytes, version, ttl):
+        self.value, self.nbytes, self.version = value, nbytes, version
+        self.used = time.monotonic()
+        self.expires = self.used + ttl if ttl else None
+
+
+class LRUCache:
+    """Thread-safe LRU mapping shared by every session of the process.
+
+    Bounded by `maxsize` entries and by the global ``CACHE_MB`` budget; entries older than
+    `ttl` seconds are rebuilt on their next use.
+    """
+
+    def __init__(self, name: str, maxsize: int = 64, ttl: float = CACHE_TTL):
+        self.name, self.maxsize, self.ttl = name, maxsize, ttl
+        self.hits = self.misses = self.shared = self.evicted = self.expired = 0
+        self.nbytes = 0
+        self._items = OrderedDict()     # key -> _Entry, least recently used first
+        self._inflight = {}             # key -> Future of a build in progress
+        CACHES[name] = self
+
+    def get_or_build(self, key, build, version: tuple = None):
+        """Cached value of `key`, else ``build()``; `version` is the data version the value derives from."""
+        with _LOCK:
+            entry = self._items.get(key)
+            if entry is not None and entry.expires is not None and entry.expires < time.monotonic():
+                self._drop(key)
+                self.expired += 1
+                entry = None
+            if entry is not None:
+                entry.used = time.monotonic()
+                self._items.move_to_end(key)
+                self.hits += 1
+            else:
+                pending = self._inflight.get(key)
+                if pending is None:
+                    self._inflight[key] = Future()
+                    self.misses += 1
+                else:
+                    self.shared += 1
+        if entry is not None:
+            perf.count(self.name, True)
+            return entry.value
+        perf.count(self.name, pending is not None)  # waiting on another session's build counts as a hit
+        if pending is not None:
+            return pending.result()
+
+        try:
+            value = build()
+        except BaseException as e:
+            with _LOCK:
+                future = self._inflight.pop(key)
+            future.set_exception(e)
+            raise
+        entry = _Entry(value, approx_size(value), version, self.ttl)
+        with _LOCK:
+            future = self._inflight.pop(key)
+            if key in self._items:
+                self._drop(key)
+            self._items[key] = entry
+            self.nbytes += entry.nbytes
+            while len(self._items) > self.maxsize:
+                self._drop(next(iter(self._items)))
+                self.evicted += 1
+            _evict_to_budget()
+        future.set_result(value)
+        return value
+
+    def _drop(self, key):
+        self.nbytes -= self._items.pop(key).nbytes
+
+
+def _evict_to_budget():
+    """Evict the least recently used entry of any cache until the budget holds (caller holds _LOCK)."""
+    budget = CACHE_MB * 2**20
+    while sum(c.nbytes for c in CACHES.values()) > budget:
+        victim = min((c for c in CACHES.values() if c._items),
+                     key=lambda c: next(iter(c._items.values())).used, default=None)
+        if victim is None:
+            return
+        victim._drop(next(iter(victim._items)))
+        victim.evicted += 1
+
+
+def invalidate_stale(version: tuple) -> int:
+    """Drop every entry built from another version of the same source as `version`; returns the count."""
+    dropped = 0
+    with _LOCK:
+        for cache in CACHES.values():
+            stale = [k for k, e in cache._items.items()
+                     if e.version is not None and e.version[0] == version[0] and e.version != version]
+            for key in stale:
+                cache._drop(key)
+            dropped += len(stale)
+    return dropped
+
+
+def cache_stats() -> dict:
+    """Process-wide counters and size of every named cache."""
+    with _LOCK:
+        return {name: {"hits": c.hits, "misses": c.misses, "shared": c.shared, "evicted": c.evicted,
+                       "expired": c.expired, "size": len(c._items), "MB": round(c.nbytes / 2**20, 2)}
+                for name, c in CACHES.items()}
@@ -0,0 +1,195 @@
+"""Gallery figures: time aggregation, Plotly builders and a memoized lazy registry.
+
+Builders roll up the filtered metrics cube (see ``campaign.cube``), never raw rows.
+Each gallery entry is a builder, so a rerun only constructs the chart on screen.
+Built figures are memoized per (filter selection, chart id) in a bounded LRU.
+Line series are downsampled to about the chart's pixel width before plotting, and long
+ones switch to WebGL traces, so the figure JSON sent on each rerun stays small.
+"""
+import os
+from functools import cached_property
+
+import pandas as pd
+import plotly.express as px
+
+from campaign import perf
+from campaign.cache import LRUCache
+from campaign.cube import rollup
+from campaign.downsample import downsample
+from campaign.ratios import best_per_group, ratio_rollup
+from campaign.timeseries import RollingSeries, rolling_label, window_periods
+
+GALLERY_HEIGHT = 420
+PLOT_POINTS = int(os.environ.get("DASHBOARD_PLOT_POINTS", "1000"))     # per line; ~ chart width in px, 0 = all
+WEBGL_POINTS = int(os.environ.get("DASHBOARD_WEBGL_POINTS", "1000"))   # total points above which lines use WebGL
+
+FIGURES = LRUCache("figures", maxsize=64)  # (selection, granularity, window, chart id) -> figure
+SERIES = LRUCache("series", maxsize=16)    # (selection, granularity) -> RollingSeries
+
+
+# =========================
+# AXES
+# =========================
+def tune_time_axes(fig, yfmt=",.0f", height=440, ytitle="", y0=True, y_max=None, x_dtick="M1", x_fmt="%b %Y"):
+    fig.update_traces(mode="lines", line=dict(width=3))
+    fig.update_layout(template="plotly_white", height=height,
+                      margin=dict(l=12, r=12, t=56, b=8),
+                      legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5),
+                      hovermode=False, yaxis_title=ytitle)
+    fig.update_yaxes(tickformat=yfmt, showgrid=True, gridwidth=1, gridcolor="rgba(0,0,0,0.10)",
+                     zeroline=False, ticks="outside", ticklen=6,
+                     rangemode="tozero" if y0 else None,
+                     range=[0, y_max] if y_max is not None else None)
+    fig.update_xaxes(showgrid=True, gridwidth=1, gridcolor="rgba(0,0,0,0.08)",
+                     ticks="outside", ticklen=6, tickangle=0,
+                     dtick=x_dtick, tickformat=x_fmt)
+    return fig
+
+def choose_dtick_and_fmt(d1, d2, gran):
+    days = (pd.to_datetime(d2) - pd.to_datetime(d1)).days + 1
+    if gran == "Daily":
+        if days <= 31:  return "D1", "%d %b"
+        if days <= 120: return "M1", "%b %Y"
+        return "M2", "%b %Y"
+    if gran == "Weekly":
+        if days <= 90:  return "W1", "%d %b"
+        return "M1", "%b %Y"
+    return "M1", "%b %Y"
+
+
+# =========================
+# GALLERY INPUTS
+# =========================
+class GalleryData:
+    """Filtered cube cells plus the derived inputs the builders share, computed on first use."""
+
+    def __init__(self, cells: pd.DataFrame, sel_key: tuple, granularity: str = "Daily", window_days: int = 7,
+                 max_points: int = PLOT_POINTS):
+        self.cells, self.sel_key = cells, sel_key
+        self.granularity = granularity
+        self.window = window_periods(granularity, window_days)
+        self.max_points = max_points
+
+    @property
+    def key(self) -> tuple:
+        return (self.sel_key, self.granularity, self.window, self.max_points)
+
+    @cached_property
+    def series(self) -> RollingSeries:
+        """Prefix sums of the selection, reused by every window of the same granularity."""
+        def build():
+            with perf.stage("aggregate"):
+                return RollingSeries.from_cells(self.cells, self.granularity)
+        return SERIES.get_or_build((self.sel_key, self.granularity), build, version=self.sel_key[0])
+
+    @cached_property
+    def agg(self) -> pd.DataFrame:
+        series = self.series
+        with perf.stage("rolling window"):
+            return series.frame(self.window)
+
+    @cached_property
+    def ticks(self) -> tuple:
+        return choose_dtick_and_fmt(self.cells["Date"].min(), self.cells["Date"].max(), self.granularity)
+
+    @cached_property
+    def has_hours(self) -> bool:
+        return bool(self.cells["Hour"].notna().any())
+
+
+# =========================
+# FIGURE BUILDERS
+# =========================
+def make_time_fig(data: GalleryData, y, yfmt, ytitle):
+    agg, (x_dtick, x_fmt) = data.agg, data.ticks
+    points = downsample(agg, "Date", y, by="Channel", max_points=data.max_points)
+    fig = px.line(points, x="Date", y=y, color="Channel", title=None,
+                  render_mode="webgl" if len(points) > WEBGL_POINTS else "svg")
+    fig.update_layout(title=dict(text=ytitle, x=0.01, y=0.98, xanchor="left", font=dict(size=16)))
+    return tune_time_axes(fig, yfmt=yfmt, height=GALLERY_HEIGHT, ytitle=ytitle,
+                          y0=True,
+                          y_max=float(agg[y].max()*1.12) if not agg.empty else None,
+                          x_dtick=x_dtick, x_fmt=x_fmt)
+
+def make_city_ctr_fig(data: GalleryData):
+    city_ctr = ratio_rollup(data.cells, ["City"])[["City", "CTR (%)"]].sort_values("CTR (%)", ascending=False)
+    fig = px.bar(city_ctr, x="City", y="CTR (%)",
+                 text=city_ctr["CTR (%)"].map(lambda v: f"{v:.2f}%"), title=None)
+    fig.update_traces(textposition="outside", cliponaxis=False)
+    fig.update_layout(template="plotly_white", height=GALLERY_HEIGHT,
+                      margin=dict(l=12, r=12, t=56, b=8),
+                      title=dict(text="CTR (%) by City (weighted)", x=0.01, y=0.98, xanchor="left", font=dict(size=16)),
+                      hovermode=False, yaxis_title="CTR (%)")
+    fig.update_yaxes(tickformat=".2f",
+                     range=[0, float(city_ctr["CTR (%)"].max()*1.2) if not city_ctr.empty else None],
+                     showgrid=True, gridcolor="rgba(0,0,0,0.10)")
+    return fig
+
+def make_city_clicks_fig(data: GalleryData):
+    city_channel = rollup(data.cells, ["City", "Channel"])[["City", "Channel", "Clicks"]]
+    fig = px.bar(city_channel, x="City", y="Clicks", color="Channel", barmode="stack", title=None)
+    fig.update_layout(template="plotly_white", height=GALLERY_HEIGHT,
+                      margin=dict(l=12, r=12, t=56, b=8),
+                      title=dict(text="Clicks by City & Channel", x=0.01, y=0.98, xanchor="left", font=dict(size=16)),
+                      hovermode=False, yaxis_title="Clicks")
+    fig.update_yaxes(tickformat=",.0f",
+                     range=[0, float(city_channel["Clicks"].max()*1.15) if not city_channel.empty else None],
+                     showgrid=True, gridcolor="rgba(0,0,0,0.10)")
+    return fig
+
+def make_best_hour_by_city_fig(data: GalleryData):
+    if not data.has_hours:
+        return None
+    city_hour_ctr = ratio_rollup(data.cells, ["City", "Hour"])
+    best_hour = best_per_group(city_hour_ctr, "City", "CTR (%)").sort_values("CTR (%)", ascending=False)
+
+    fig = px.bar(
+        best_hour, x="City", y="CTR (%)",
+        text=best_hour["Hour"].astype(int).astype(str).str.zfill(2) + ":00",
+        title=None
+    )
+    fig.update_traces(textposition="outside", showlegend=False, cliponaxis=False)
+    fig.update_layout(template="plotly_white", height=GALLERY_HEIGHT,
+                      margin=dict(l=12, r=12, t=56, b=8),
+                      title=dict(text="Best Hour by City (highest CTR)", x=0.01, y=0.98, xanchor="left", font=dict(size=16)),
+                      hovermode=False, yaxis_title="CTR (%)")
+    fig.update_yaxes(tickformat=".2f",
+                     range=[0, float(best_hour["CTR (%)"].max()*1.2) if not best_hour.empty else None],
+                     showgrid=True, gridcolor="rgba(0,0,0,0.10)")
+    return fig
+
+
+# =========================
+# LAZY GALLERY REGISTRY
+# =========================
+# (chart id, title, builder(data) -> figure); nothing is built until a chart is shown.
+# "{roll}" in a title is replaced by the current granularity/window, e.g. "Daily + 7-day rolling".
+GALLERY = [
+    ("impressions", "Impressions by Channel ({roll})",                lambda d: make_time_fig(d, "Impressions", ",.0f", "Impressions")),
+    ("clicks",      "Clicks by Channel ({roll})",                     lambda d: make_time_fig(d, "Clicks", ",.0f", "Clicks")),
+    ("ctr",         "CTR (%) by Channel ({roll})",                    lambda d: make_time_fig(d, "CTR (%)", ".2f", "CTR (%)")),
+    ("cpc",         "CPC (€) by Channel ({roll})",                    lambda d: make_time_fig(d, "CPC (€)", ",.2f", "CPC (€)")),
+    ("city_ctr",    "CTR (%) by City (weighted)",                     make_city_ctr_fig),
+    ("city_clicks", "Clicks by City & Channel",                       make_city_clicks_fig),
+    ("best_hour",   "Best Hour by City (highest CTR)",                make_best_hour_by_city_fig),
+]
+
+def gallery_for(data: GalleryData) -> list:
+    """Gallery entries available for this data (the best-hour chart needs an Hour column)."""
+    roll = rolling_label(data.granularity, data.window)
+    return [(cid, title.format(roll=roll), build) for cid, title, build in GALLERY
+            if cid != "best_hour" or data.has_hours]
+
+
+def figure_payload(fig) -> int:
+    """Size in bytes of the figure JSON sent to the browser."""
+    return len(fig.to_json().encode())
+
+
+def gallery_figure(chart, data: GalleryData):
+    """Return the figure for one gallery entry, memoized per (selection, granularity, window, chart id)."""
+    chart_id, _, build = chart
+    def timed_build():
+        with perf.stage(f"figure:{chart_id}"):
+            return build(data)
+    return FIGURES.get_or_build((data.key, chart_id), timed_build, version=data.sel_key[0])
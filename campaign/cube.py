@@ -0,0 +1,173 @@
+"""Additive City × Channel × Date × Hour metrics cube.
+
+Built once per data version from the enriched rows. Filters slice the cube and every KPI,
+chart and insight rolls it up, so interaction cost scales with the number of distinct
+cells instead of the raw (hourly, ever-growing) row count.
+"""
+import numpy as np
+import pandas as pd
+
+from campaign.filter_index import FilterIndex, take_rows
+
+CUBE_DIMS = ["City", "Channel", "Date", "Hour"]
+# "CTR sum"/"CTR rows" keep the unweighted per-row CTR mean (the "Avg CTR" KPI) additive.
+CUBE_MEASURES = ["Impressions", "Clicks", "Spend (€)", "CTR sum", "CTR rows"]
+DAY_NS = 86_400 * 10**9
+
+
+def build_cube(df: pd.DataFrame) -> pd.DataFrame:
+    """Sum the additive measures of `df` per City × Channel × Date (day) × Hour cell."""
+    ctr = df["CTR (%)"]
+    rows = pd.DataFrame({
+        "City": df["City"],
+        "Channel": df["Channel"],
+        "Date": pd.to_datetime(df["Date"]).dt.normalize(),
+        "Hour": df["Hour"] if "Hour" in df.columns else pd.Series(pd.NA, index=df.index, dtype="Int64"),
+        "Impressions": df["Impressions"].astype("int64"),
+        "Clicks": df["Clicks"].astype("int64"),
+        "Spend (€)": df["Spend (€)"].astype("float64"),
+        "CTR sum": ctr.fillna(0).astype("float64"),
+        "CTR rows": ctr.notna().astype("int64"),
+    })
+    # Rows without City/Channel can never pass the filters; NaT dates and missing hours
+    # still count towards totals, so those groups are kept.
+    rows = rows.dropna(subset=["City", "Channel"])
+    return rows.groupby(CUBE_DIMS, dropna=False, observed=True, sort=True)[CUBE_MEASURES].sum().reset_index()
+
+
+def merge_cubes(*cubes: pd.DataFrame) -> pd.DataFrame:
+    """Fold cubes into one by summing matching cells; cost scales with cells, not raw rows."""
+    parts = [c for c in cubes if not c.empty] or list(cubes[:1])
+    merged = pd.concat(parts, ignore_index=True).astype({"City": "category", "Channel": "category"})
+    return merged.groupby(CUBE_DIMS, dropna=False, observed=True, sort=True)[CUBE_MEASURES].sum().reset_index()
+
+
+def _gather(col: pd.Series, rows) -> pd.Series:
+    """`col` at positions `rows` (the column itself for None), without touching any other column."""
+    return col if rows is None else pd.Series(col.array.take(rows), name=col.name, copy=False)
+
+
+class CubeSlice:
+    """Cells of `cube` at the sorted positions `rows` (None: every cell), not copied.
+
+    ``rollup`` and ``totals`` reduce the positions directly, gathering only the columns they sum
+    and group by; any other column is gathered on first access. Read-only, like the cube.
+    """
+
+    def __init__(self, cube: pd.DataFrame, rows=None):
+        self.cube, self.rows = cube, rows
+        self._columns = {}
+
+    def __len__(self) -> int:
+        return len(self.cube) if self.rows is None else len(self.rows)
+
+    @property
+    def empty(self) -> bool:
+        return len(self) == 0
+
+    def __getitem__(self, col: str) -> pd.Series:
+        if col not in self._columns:
+            self._columns[col] = _gather(self.cube[col], self.rows)
+        return self._columns[col]
+
+    def frame(self) -> pd.DataFrame:
+        """The cells as a DataFrame (copies every column unless the slice is the whole cube)."""
+        return take_rows(self.cube, self.rows)
+
+
+def slice_cube(cube: pd.DataFrame, index: FilterIndex, channels, cities, dates=None) -> CubeSlice:
+    """Cells matching the Channel and City selections within the optional (start, end) `dates`, via the filter index."""
+    return CubeSlice(cube, index.select(dates, Channel=channels, City=cities))
+
+
+def _key_codes(col: pd.Series):
+    """``(codes, size, decode)`` of a cube key: dense codes in sort order, -1 for missing; None if unsupported."""
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        return col.cat.codes.to_numpy(), len(col.cat.categories), lambda codes: pd.Categorical.from_codes(codes, dtype=col.dtype)
+
+    if pd.api.types.is_datetime64_dtype(col.dtype):  # cube dates are whole days (see build_cube)
+        ns = col.to_numpy(dtype="datetime64[ns]").view(np.int64)
+        valid = ns != np.iinfo(np.int64).min
+        lo = int(ns[valid].min()) if valid.any() else 0
+        codes = (ns - lo) // DAY_NS
+        codes[~valid] = -1
+
+        def decode_days(codes):
+            days = (codes * DAY_NS + lo).view("datetime64[ns]").astype(col.dtype)
+            days[codes < 0] = np.datetime64("NaT")
+            return days
+        return codes, int(codes.max()) + 1 if valid.any() else 0, decode_days
+
+    if pd.api.types.is_integer_dtype(col.dtype):  # Hour (nullable Int8)
+        lo = col.min()
+        lo = 0 if pd.isna(lo) else int(lo)
+        codes = col.to_numpy(dtype=np.int64, na_value=lo - 1) - lo
+
+        def decode_ints(codes):
+            ints = pd.array(np.where(codes >= 0, codes + lo, 0), dtype=col.dtype)
+            if (codes < 0).any():
+                ints[codes < 0] = pd.NA
+            return ints
+        return codes, int(codes.max()) + 1 if len(codes) else 0, decode_ints
+    return None
+
+
+def rollup(cells, keys, dropna: bool = True, rows=None) -> pd.DataFrame:
+    """Sum the cube measures of `cells` per `keys` (rows with a missing key are dropped unless `dropna` is False).
+
+    `cells` is a cube frame, reduced at positions `rows` when given, or a ``CubeSlice``; only the
+    key and measure columns are gathered at those positions. Keys are mapped to dense codes (category codes, day and hour offsets) combined into one group id,
+    and every measure is reduced with ``np.bincount`` — no hashing, and it runs directly on the
+    memory-mapped arrays of an array store. Same result as ``groupby(keys, observed=True, sort=True)``.
+    """
+    if isinstance(cells, CubeSlice):
+        cells, rows = cells.cube, cells.rows
+    keys = list(keys)
+    n_rows = len(cells) if rows is None else len(rows)
+    coded = [_key_codes(_gather(cells[k], rows)) for k in keys] if n_rows else [None]
+    if any(c is None for c in coded):
+        frame = take_rows(cells, rows)
+        return frame.groupby(keys, dropna=dropna, observed=True, sort=True)[CUBE_MEASURES].sum().reset_index()
+
+    keep, dims, ids = None, [], None
+    for key_codes, size, _ in coded:
+        missing = key_codes < 0
+        if missing.any():
+            if dropna:
+                keep = ~missing if keep is None else keep & ~missing
+            key_codes = np.where(missing, size, key_codes)   # missing sorts last, like groupby(dropna=False)
+        dims.append(size + 1)
+        ids = key_codes.astype(np.int64) if ids is None else ids * dims[-1] + key_codes
+    if keep is not None:
+        ids = ids[keep]
+
+    n_ids = int(np.prod(dims, dtype=np.float64))
+    dense = n_ids <= max(4 * len(ids), 1 << 16)      # small group space: reduce in O(rows + groups)
+    if dense:
+        groups = np.flatnonzero(np.bincount(ids, minlength=n_ids))
+    else:
+        groups, ids = np.unique(ids, return_inverse=True)
+
+    out = {}
+    for k, (_, _, decode), group_codes, size in zip(keys, coded, np.unravel_index(groups, dims), dims):
+        out[k] = decode(np.where(group_codes == size - 1, -1, group_codes))
+    for m in CUBE_MEASURES:
+        values = cells[m].to_numpy()
+        if rows is not None:
+            values = values[rows]
+        if keep is not None:
+            values = values[keep]
+        sums = np.bincount(ids, weights=values, minlength=n_ids if dense else len(groups))
+        sums = sums[groups] if dense else sums
+        out[m] = np.rint(sums).astype(values.dtype) if values.dtype.kind in "iu" else sums.astype(values.dtype)
+    return pd.DataFrame(out)
+
+
+def totals(cells, rows=None) -> pd.Series:
+    """Grand totals of the cube measures of `cells` (as in ``rollup``), plus the unweighted row-level CTR mean."""
+    if isinstance(cells, CubeSlice):
+        cells, rows = cells.cube, cells.rows
+    tot = pd.Series({m: (cells[m].to_numpy() if rows is None else cells[m].to_numpy()[rows]).sum()
+                     for m in CUBE_MEASURES})
+    tot["Avg CTR (%)"] = tot["CTR sum"] / tot["CTR rows"] if tot["CTR rows"] > 0 else np.nan
+    return tot
@@ -0,0 +1,159 @@
+"""Campaign data loading: CSV ingest, metric enrichment and a columnar on-disk cache.
+
+The CSV is parsed once per file version (path, mtime, size). The enriched frame is
+narrowed to ``SCHEMA`` (categoricals, 32-bit numbers), persisted as Parquet under
+``CACHE_DIR`` and kept in a process-wide cache, so Streamlit reruns and new sessions
+reuse it instead of re-parsing the source.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+from campaign import perf
+from campaign.ratios import add_ratios
+
+log = logging.getLogger(__name__)
+
+CACHE_DIR = Path("data/.cache")
+CACHE_FORMAT = 2  # bump when the enriched layout changes, invalidates every Parquet cache
+
+REQUIRED_COLS = {"Date", "City", "Channel", "Impressions", "Clicks", "Spend (€)"}
+DROP_COLS = ["Creative", "Influencer", "Likes", "Shares", "Saves", "Comments"]
+
+# Compact in-memory schema of the enriched frame. Sums are always taken in 64 bits downstream.
+SCHEMA = {
+    "City": "category",
+    "Channel": "category",
+    "Hour": "Int8",
+    "Impressions": "int32",
+    "Clicks": "int32",
+    "Spend (€)": "float32",
+    "CTR (%)": "float32",
+    "CPC (€)": "float32",
+    "CPM (€)": "float32",
+}
+
+_FRAMES: dict = {}              # source key -> enriched frame (process-wide)
+_LOCK = threading.Lock()
+
+
+def ensure_metrics(df_: pd.DataFrame) -> pd.DataFrame:
+    """Validate required columns, add CTR/CPC/CPM and drop legacy columns."""
+    miss = REQUIRED_COLS - set(df_.columns)
+    if miss:
+        raise ValueError(f"Missing required columns: {miss}")
+    if not pd.api.types.is_datetime64_any_dtype(df_["Date"]):
+        df_["Date"] = pd.to_datetime(df_["Date"], errors="coerce")
+
+    # Derived metrics
+    df_ = add_ratios(df_)
+
+    # Drop legacy/unused cols if present
+    df_ = df_.drop(columns=[c for c in DROP_COLS if c in df_.columns], errors="ignore")
+
+    # Optional hour
+    if "Hour" in df_.columns:
+        df_["Hour"] = pd.to_numeric(df_["Hour"], errors="coerce").clip(0, 23).astype("Int64")
+
+    return df_
+
+
+def apply_schema(df_: pd.DataFrame) -> pd.DataFrame:
+    """Cast the columns of `df_` that appear in SCHEMA to their compact dtype."""
+    return df_.astype({c: t for c, t in SCHEMA.items() if c in df_.columns})
+
+
+def memory_report(before: pd.DataFrame, after: pd.DataFrame) -> pd.DataFrame:
+    """Deep memory usage per column (bytes) of two versions of a frame, with the total last."""
+    rep = pd.DataFrame({
+        "dtype before": before.dtypes.astype(str),
+        "dtype after": after.dtypes.astype(str),
+        "bytes before": before.memory_usage(index=False, deep=True),
+        "bytes after": after.memory_usage(index=False, deep=True),
+    }).fillna({"dtype before": "—", "dtype after": "—"})
+    rep.loc["Total"] = ["", "", rep["bytes before"].sum(), rep["bytes after"].sum()]
+    rep[["bytes before", "bytes after"]] = rep[["bytes before", "bytes after"]].fillna(0).astype("int64")
+    rep["saved (%)"] = (1 - rep["bytes after"] / rep["bytes before"].where(rep["bytes before"] > 0)) * 100
+    return rep
+
+
+def source_key(path: Path) -> tuple:
+    """Version key of a source file: (resolved path, mtime in ns, size in bytes)."""
+    st_ = os.stat(path)
+    return (str(Path(path).resolve()), st_.st_mtime_ns, st_.st_size)
+
+
+DIGEST_GLOB = "[0-9a-f]" * 16  # matches the version digest of a cache file name, and nothing else
+
+
+def _cache_path(key: tuple, cache_dir: Path) -> Path:
+    """``<stem>-<source digest>-<version digest>.parquet``: versions of one source share all but the last digest."""
+    source = hashlib.sha1(key[0].encode()).hexdigest()[:8]
+    digest = hashlib.sha1(repr((CACHE_FORMAT,) + key).encode()).hexdigest()[:16]
+    return cache_dir / f"{Path(key[0]).stem}-{source}-{digest}.parquet"
+
+
+def _versions(cached: Path, suffix: str) -> list:
+    """Cached files with `suffix` of every version of the source `cached` belongs to (itself included)."""
+    source = cached.name[:-len(cached.suffix)].rsplit("-", 1)[0]
+    return list(cached.parent.glob(f"{source}-{DIGEST_GLOB}{suffix}"))
+
+
+def _read_enriched(path: Path, key: tuple, cache_dir: Path) -> pd.DataFrame:
+    cached = _cache_path(key, cache_dir)
+    if cached.exists():
+        try:
+            return pd.read_parquet(cached)
+        except Exception as e:  # corrupt/partial cache file: rebuild it
+            log.warning("Ignoring unreadable cache %s: %s", cached, e)
+
+    wide = ensure_metrics(pd.read_csv(path, parse_dates=["Date"]))
+    df = apply_schema(wide)
+    report = memory_report(wide, df)
+    del wide
+    log.info("Ingested %s: %d rows, %s -> %s bytes in memory", path, len(df),
+             f"{report.at['Total', 'bytes before']:,}", f"{report.at['Total', 'bytes after']:,}")
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        for suffix in (".parquet", ".memory.json"):  # older versions of this source's own files only
+            for old in _versions(cached, suffix):
+                old.unlink(missing_ok=True)
+        tmp = cached.with_suffix(f".{os.getpid()}.tmp")
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, cached)  # atomic: concurrent workers never see a partial file
+        cached.with_suffix(".memory.json").write_text(report.to_json(orient="index"))
+    except (OSError, ImportError) as e:
+        log.warning("Could not write columnar cache %s: %s", cached, e)
+    return df
+
+
+def load_memory_report(path: Path, cache_dir: Path = CACHE_DIR):
+    """Memory report recorded when the current version of `path` was ingested, or None."""
+    sidecar = _cache_path(source_key(path), cache_dir).with_suffix(".memory.json")
+    try:
+        return pd.DataFrame.from_dict(json.loads(sidecar.read_text()), orient="index")
+    except (OSError, ValueError):
+        return None
+
+
+def load_campaign(path: Path, cache_dir: Path = CACHE_DIR) -> pd.DataFrame:
+    """Return the enriched campaign frame for `path`, re-ingesting only when the file changed.
+
+    The returned frame is shared across reruns and sessions: treat it as read-only.
+    """
+    key = source_key(path)
+    with _LOCK:
+        df = _FRAMES.get(key)
+        perf.count("frames", df is not None)
+        if df is None:
+            with perf.stage("ingest"):
+                df = _read_enriched(Path(path), key, cache_dir)
+            for stale in [k for k in _FRAMES if k[0] == key[0]]:
+                del _FRAMES[stale]
+            _FRAMES[key] = df
+    return df
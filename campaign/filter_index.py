@@ -0,0 +1,115 @@
+"""Precomputed filter index: category codes and sorted row positions per dimension value.
+
+A Channel/City selection is resolved by concatenating the position arrays of the selected
+values and intersecting dimensions, instead of evaluating ``isin`` masks over every row.
+Selecting every value of a complete dimension is free, so the default view is the frame itself.
+Rows are also kept in date order, so a date range is located by binary search and the other
+dimensions are then checked on that window only: a narrow range costs time proportional to its size.
+"""
+import numpy as np
+import pandas as pd
+
+
+ONE_DAY = np.timedelta64(1, "D")
+
+
+class FilterIndex:
+    """Row positions of `frame` per value of each dimension in `dims`, plus a date order, built once."""
+
+    def __init__(self, frame: pd.DataFrame, dims=("Channel", "City"), date_col: str = "Date"):
+        arrays, values = {}, {}
+        for dim in dims:
+            codes, uniques = pd.factorize(frame[dim], sort=True)     # -1 marks missing values
+            order = np.argsort(codes, kind="stable")                  # stable: positions stay sorted
+            bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+            arrays[f"{dim}.codes"] = codes.astype(np.int32)
+            for i in range(len(uniques)):                             # one position list per value
+                arrays[f"{dim}.{i}"] = order[bounds[i]:bounds[i + 1]]
+            values[dim] = list(uniques)
+
+        dates = frame[date_col].to_numpy(dtype="datetime64[ns]")
+        arrays["by_date"] = np.argsort(dates, kind="stable")          # NaT sorts last
+        arrays["dates"] = dates[arrays["by_date"]][:int((~np.isnat(dates)).sum())]
+        self._attach(len(frame), arrays, values)
+
+    @classmethod
+    def from_arrays(cls, n_rows: int, arrays: dict, values: dict) -> "FilterIndex":
+        """Index over previously built ``arrays`` (e.g. memory-mapped from an array store), without rebuilding."""
+        index = cls.__new__(cls)
+        index._attach(n_rows, arrays, values)
+        return index
+
+    def _attach(self, n_rows: int, arrays: dict, values: dict):
+        self.n_rows, self.arrays, self.values = n_rows, arrays, values
+        self.codes, self._positions, self._complete = {}, {}, {}
+        for dim, uniques in values.items():
+            self.codes[dim] = arrays[f"{dim}.codes"]
+            self._positions[dim] = {v: arrays[f"{dim}.{i}"] for i, v in enumerate(uniques)}
+            self._complete[dim] = sum(map(len, self._positions[dim].values())) == n_rows  # no missing values
+        self._by_date, self._dates = arrays["by_date"], arrays["dates"]
+        self.span = (pd.Timestamp(self._dates[0]), pd.Timestamp(self._dates[-1])) if len(self._dates) else None
+
+    def appended(self, frame: pd.DataFrame, date_col: str = "Date"):
+        """Tails to append to ``arrays`` so the index also covers `frame`, stored after the indexed rows.
+
+        Returns None when the index has to be rebuilt instead: `frame` brings a new dimension value,
+        a missing value or date, or a date before the last indexed one (or the index has undated rows).
+        Existing positions never move, so readers of the shorter arrays keep a valid index.
+        """
+        dates = frame[date_col].to_numpy(dtype="datetime64[ns]")
+        if len(self._dates) != self.n_rows or np.isnat(dates).any() or (
+                len(dates) and len(self._dates) and dates.min() < self._dates[-1]):
+            return None
+        tails = {}
+        for dim, uniques in self.values.items():
+            codes = pd.Categorical(frame[dim], categories=uniques).codes
+            if (codes < 0).any():
+                return None
+            tails[f"{dim}.codes"] = codes.astype(np.int32)
+            for i in range(len(uniques)):
+                tails[f"{dim}.{i}"] = self.n_rows + np.flatnonzero(codes == i)
+        order = np.argsort(dates, kind="stable")
+        tails["by_date"] = self.n_rows + order
+        tails["dates"] = dates[order]
+        return tails
+
+    def _window(self, start, end) -> np.ndarray:
+        """Sorted positions of rows dated within [start, end] (whole days), by binary search."""
+        lo = np.searchsorted(self._dates, np.datetime64(pd.Timestamp(start).normalize(), "ns"), side="left")
+        hi = np.searchsorted(self._dates, np.datetime64(pd.Timestamp(end).normalize(), "ns") + ONE_DAY, side="left")
+        return np.sort(self._by_date[lo:hi])
+
+    def covers(self, dates) -> bool:
+        """True when the (start, end) range `dates` spans every dated row, i.e. filters nothing."""
+        return (dates is None or self.span is None
+                or (pd.Timestamp(dates[0]) <= self.span[0] and pd.Timestamp(dates[1]) >= self.span[1]))
+
+    def select(self, dates=None, **selection):
+        """Sorted row positions within `dates` matching every ``dim=values`` selection; None means all rows.
+
+        `dates` is an inclusive (start, end) day range; a range that covers the data keeps undated rows.
+        """
+        if not self.covers(dates):
+            pos = self._window(*dates)
+            for dim, chosen in selection.items():
+                chosen = set(chosen)
+                if self._complete[dim] and chosen >= self._positions[dim].keys():
+                    continue
+                wanted = [code for code, v in enumerate(self.values[dim]) if v in chosen]
+                pos = pos[np.isin(self.codes[dim][pos], wanted)]
+            return pos
+        result = None
+        for dim, chosen in selection.items():
+            lists = self._positions[dim]
+            chosen = [v for v in set(chosen) if v in lists]
+            if self._complete[dim] and len(chosen) == len(lists):
+                continue
+            pos = (np.sort(np.concatenate([lists[v] for v in chosen])) if chosen
+                   else np.empty(0, dtype=np.intp))
+            result = pos if result is None else np.intersect1d(result, pos, assume_unique=True)
+        return result
+
+
+def take_rows(frame: pd.DataFrame, positions) -> pd.DataFrame:
+    """`frame` restricted to `positions` (from ``FilterIndex.select``); the frame itself for None."""
+    return frame if positions is None else frame.iloc[positions]
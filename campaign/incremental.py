@@ -0,0 +1,240 @@
+"""Incremental ingestion of a partitioned data directory (many CSVs, appended over time).
+
+``IncrementalDataset`` remembers, per CSV file, the byte offset it has consumed. A refresh
+parses only the bytes appended since then, enriches them, stores them as a new Parquet part
+and appends their cells to the cube's memory-mapped array store (``campaign.store``), extending
+its filter index. Committed cells are never rewritten: a cell of an hour already in the cube is
+appended once more and summed by the rollups, so a snapshot keeps the totals of its generation.
+Refresh cost scales with the new data, not the campaign history. The store is rebuilt (merging
+repeated cells) for a new City or Channel, a back-dated row, a truncated file, or once appended
+cells outnumber the cells it was built with, which keeps rebuilds rare. The manifest is kept in
+the store's metadata, so cells and offsets are committed together, and restarts and other
+worker processes map the store without re-reading any CSV or keeping a private copy.
+"""
+import hashlib
+import io
+import logging
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import pandas as pd
+
+from campaign import perf
+from campaign.cube import build_cube, merge_cubes
+from campaign.data_loader import CACHE_DIR, CACHE_FORMAT, apply_schema, ensure_metrics
+from campaign.filter_index import FilterIndex
+from campaign.store import append_cells, open_store, read_meta, write_store
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process use only
+    fcntl = None
+
+log = logging.getLogger(__name__)
+
+SETTLE_SECONDS = 2.0  # an unterminated last line is only read once the file is this old
+
+_DATASETS: dict = {}            # resolved directory -> IncrementalDataset (process-wide)
+_LOCK = threading.Lock()
+
+
+@contextmanager
+def _file_lock(path: Path):
+    """Exclusive lock shared by every process refreshing the same state directory."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _write_atomic(path: Path, write):
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    write(tmp)
+    os.replace(tmp, path)
+
+
+def read_appended(path: Path, offset: int, columns, settle: float = SETTLE_SECONDS):
+    """Rows of `path` after byte `offset`, up to the last complete line.
+
+    Returns ``(frame or None, new offset, columns)``; `columns` is read from the header when
+    `offset` is 0 and must be passed back for later calls.
+    """
+    st_ = os.stat(path)
+    with open(path, "rb") as f:
+        f.seek(offset)
+        data = f.read()
+    end = data.rfind(b"\n") + 1
+    if end < len(data) and time.time() - st_.st_mtime >= settle:
+        end = len(data)  # settled file without a trailing newline
+    if end == 0:
+        return None, offset, columns
+    buf = io.BytesIO(data[:end])
+    if offset == 0:
+        frame = pd.read_csv(buf, parse_dates=["Date"])
+        columns = list(frame.columns)
+    else:
+        frame = pd.read_csv(buf, names=columns, header=None, parse_dates=["Date"])
+    return frame, offset + end, columns
+
+
+class IncrementalDataset:
+    """Enriched rows and metrics cube of every CSV in `directory`, refreshed append-only."""
+
+    def __init__(self, directory: Path, pattern: str = "*.csv", state_dir: Path = None):
+        self.directory = Path(directory).resolve()
+        self.pattern = pattern
+        digest = hashlib.sha1(f"{CACHE_FORMAT}:{self.directory}:{pattern}".encode()).hexdigest()[:12]
+        self.state_dir = Path(state_dir) if state_dir else CACHE_DIR / "incremental" / f"{self.directory.name}-{digest}"
+        self._lock = threading.Lock()
+        self.manifest = self._empty_manifest()
+        self._publish(self._empty_cube())
+
+    # ---- state on disk
+    @staticmethod
+    def _empty_manifest() -> dict:
+        return {"generation": 0, "files": {}, "parts": [], "store": None}
+
+    @staticmethod
+    def _empty_rows() -> pd.DataFrame:
+        return pd.DataFrame({"Date": pd.Series(dtype="datetime64[ns]"), "City": pd.Series(dtype=object),
+                             "Channel": pd.Series(dtype=object), "Hour": pd.Series(dtype="Int64"),
+                             "Impressions": pd.Series(dtype="int64"), "Clicks": pd.Series(dtype="int64"),
+                             "Spend (€)": pd.Series(dtype="float64")})
+
+    def _empty_cube(self) -> pd.DataFrame:
+        return build_cube(apply_schema(ensure_metrics(self._empty_rows())))
+
+    @property
+    def _current_path(self) -> Path:
+        return self.state_dir / "CURRENT"  # name of the published store
+
+    def _read_manifest(self) -> dict:
+        """Manifest committed with the published store (empty if there is none: re-ingest)."""
+        try:
+            return read_meta(self.state_dir / self._current_path.read_text().strip())["manifest"]
+        except (OSError, ValueError, KeyError):
+            return self._empty_manifest()
+
+    def _publish(self, cube: pd.DataFrame, index: FilterIndex = None) -> tuple:
+        version = (str(self.directory), self.manifest["generation"])
+        self._state = (cube, index if index is not None else FilterIndex(cube), version)
+        return self._state
+
+    def _open(self) -> tuple:
+        """Map the store named by the manifest (empty cube if there is none yet)."""
+        if self.manifest["store"] is None:
+            return self._publish(self._empty_cube())
+        return self._publish(*open_store(self.state_dir / self.manifest["store"]))
+
+    def _save(self, cube: pd.DataFrame):
+        """Write `cube` as a new store carrying the manifest, point CURRENT at it and publish the mapped cube."""
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        previous, store = self.manifest["store"], f"cube-{self.manifest['generation']:06d}"
+        self.manifest["store"] = store
+        shutil.rmtree(self.state_dir / store, ignore_errors=True)
+        write_store(cube, FilterIndex(cube), self.state_dir / store, {"manifest": self.manifest})
+        _write_atomic(self._current_path, lambda p: p.write_text(store))
+        if previous not in (None, store):  # processes still mapping it keep a valid view
+            shutil.rmtree(self.state_dir / previous, ignore_errors=True)
+        self._open()
+
+    def _append(self, cells: pd.DataFrame) -> bool:
+        """Append `cells` to the published store, committing the manifest with them; False if it needs a rebuild."""
+        if self.manifest["store"] is None:
+            return False
+        if not append_cells(self.state_dir / self.manifest["store"], self._state[1], cells, {"manifest": self.manifest}):
+            return False
+        self._open()
+        return True
+
+    def _reset(self):
+        log.warning("%s: a file was truncated or replaced, re-ingesting the directory", self.directory)
+        for part in self.manifest["parts"]:
+            (self.state_dir / part).unlink(missing_ok=True)
+        generation, store = self.manifest["generation"], self.manifest["store"]
+        self.manifest = self._empty_manifest()
+        self.manifest["store"] = store                 # replaced (and deleted) by _save
+        self.manifest["generation"] = generation + 1   # never reuse a published version
+        self._save(self._empty_cube())
+
+    # ---- public API
+    @property
+    def store_dir(self):
+        """Directory of the published array store (``campaign.store.open_store``); None before any data."""
+        return None if self.manifest["store"] is None else self.state_dir / self.manifest["store"]
+
+    def snapshot(self) -> tuple:
+        """Consistent ``(cube, filter index, version)`` of the latest refresh (read-only)."""
+        return self._state
+
+    def refresh(self) -> int:
+        """Ingest rows appended since the last refresh; returns the number of new rows."""
+        with self._lock, _file_lock(self.state_dir / ".lock"):
+            disk = self._read_manifest()
+            if disk["generation"] != self.manifest["generation"]:   # another process advanced it
+                self.manifest = disk
+                self._open()
+            return self._ingest_new()
+
+    def _ingest_new(self) -> int:
+        files = self.manifest["files"]
+        new_parts, updates = [], {}
+        for path in sorted(self.directory.glob(self.pattern)):
+            st_ = os.stat(path)
+            entry = files.get(path.name, {"offset": 0, "inode": st_.st_ino, "columns": None})
+            if st_.st_ino != entry["inode"] or st_.st_size < entry["offset"]:
+                self._reset()
+                return self._ingest_new()
+            if st_.st_size == entry["offset"]:
+                continue
+            frame, offset, columns = read_appended(path, entry["offset"], entry["columns"])
+            if offset != entry["offset"]:
+                updates[path.name] = {"offset": offset, "inode": st_.st_ino, "columns": columns}
+                if frame is not None and not frame.empty:
+                    new_parts.append(frame)
+        if not updates:
+            return 0
+
+        n_new = sum(len(p) for p in new_parts)
+        cells = self._empty_cube()
+        if new_parts:
+            with perf.stage("ingest"):
+                rows = apply_schema(ensure_metrics(pd.concat(new_parts, ignore_index=True)))
+                part = f"part-{self.manifest['generation'] + 1:06d}.parquet"
+                self.state_dir.mkdir(parents=True, exist_ok=True)
+                _write_atomic(self.state_dir / part, lambda p: rows.to_parquet(p, index=False))
+                self.manifest["parts"].append(part)
+                cells = build_cube(rows)
+        files.update(updates)
+        self.manifest["generation"] += 1
+        with perf.stage("ingest"):
+            if not self._append(cells):
+                log.info("%s: rebuilding the cube store", self.directory)
+                self._save(merge_cubes(self._state[0], cells))
+        log.info("%s: +%d rows from %d file(s), %d cube cells", self.directory, n_new, len(updates), len(self._state[0]))
+        return n_new
+
+    def frame(self) -> pd.DataFrame:
+        """All enriched rows ingested so far (reads the Parquet parts; not needed by the dashboard)."""
+        parts = [pd.read_parquet(self.state_dir / p) for p in self.manifest["parts"]]
+        return pd.concat(parts, ignore_index=True) if parts else apply_schema(ensure_metrics(self._empty_rows()))
+
+
+def load_directory(directory: Path, pattern: str = "*.csv") -> IncrementalDataset:
+    """Process-wide dataset for `directory`, refreshed with any newly appended rows."""
+    key = (str(Path(directory).resolve()), pattern)
+    with _LOCK:
+        ds = _DATASETS.get(key)
+        if ds is None:
+            ds = _DATASETS[key] = IncrementalDataset(directory, pattern)
+    ds.refresh()
+    return ds
@@ -0,0 +1,95 @@
+"""English narrative (insights & recommendations) for the current filter selection.
+
+The narrative is derived from one grouped reduction of the cube cells at the finest grain it
+needs (City × Channel × Hour); every coarser rollup, winner and best hour comes from that small
+table. Generated text is memoized per filter selection.
+"""
+import pandas as pd
+
+from campaign import perf
+from campaign.cache import LRUCache
+from campaign.cube import rollup
+from campaign.ratios import add_ratios, best_per_group, safe_ratio
+
+NARRATIVES = LRUCache("narratives", maxsize=64)   # selection key -> markdown
+
+
+def _pick(frame: pd.DataFrame, col: str, largest: bool):
+    """Row with the highest/lowest `col` (first row if `col` is all NaN), None for an empty frame."""
+    if frame.empty:
+        return None
+    s = frame[col]
+    if s.isna().all():
+        return frame.iloc[0]
+    return frame.loc[s.idxmax() if largest else s.idxmin()]
+
+
+def text_insights_en(df: pd.DataFrame) -> str:
+    """Markdown narrative for the filtered cube cells `df`."""
+    if df.empty:
+        return "_No data for the selected filters._"
+
+    # Single reduction at the finest grain; missing hours are kept so totals stay exact
+    fine = rollup(df, ["City","Channel","Hour"], dropna=False)
+
+    # Totals
+    tot_impr = int(fine["Impressions"].sum())
+    tot_clk  = int(fine["Clicks"].sum())
+    tot_spend= float(fine["Spend (€)"].sum())
+    ctr_g    = safe_ratio(tot_clk, tot_impr, 100)
+    cpc_g    = safe_ratio(tot_spend, tot_clk)
+    cpm_g    = safe_ratio(tot_spend, tot_impr, 1000)
+
+    # By channel / by city
+    ch   = add_ratios(rollup(fine, ["Channel"]))
+    city = add_ratios(rollup(fine, ["City"]))
+    best_ctr, best_cpc, best_cpm = _pick(ch, "CTR (%)", True), _pick(ch, "CPC (€)", False), _pick(ch, "CPM (€)", False)
+    top_city_ctr, best_city_cpc  = _pick(city, "CTR (%)", True), _pick(city, "CPC (€)", False)
+
+    # City × Channel winners (highest CTR)
+    winners = best_per_group(add_ratios(rollup(fine, ["City","Channel"])), "City", "CTR (%)")
+
+    # Best hour (if available)
+    hour_lines = []
+    if fine["Hour"].notna().any():
+        best_hour = best_per_group(add_ratios(rollup(fine, ["City","Hour"])), "City", "CTR (%)")
+        hour_lines = [f"- **{c}**: best around **{int(h):02d}:00** (CTR **{v:.2f}%**)."
+                      for c, h, v in zip(best_hour["City"], best_hour["Hour"], best_hour["CTR (%)"])]
+
+    # Helpers
+    pct = lambda x: "—" if pd.isna(x) else f"{x:.2f}%"
+    eur = lambda x: "—" if pd.isna(x) else f"{x:,.2f}€"
+    i   = lambda x: f"{int(x):,}"
+
+    lines = []
+    lines.append(f"**Overall.** {i(tot_impr)} impressions, {i(tot_clk)} clicks → **CTR {pct(ctr_g)}**, **CPC {eur(cpc_g)}**, **CPM {eur(cpm_g)}**.")
+    if best_ctr is not None and best_cpc is not None and best_cpm is not None:
+        lines.append(f"**By channel.** Highest CTR on **{best_ctr['Channel']}** ({pct(best_ctr['CTR (%)'])}); "
+                     f"lowest CPC on **{best_cpc['Channel']}** ({eur(best_cpc['CPC (€)'])}); "
+                     f"lowest CPM on **{best_cpm['Channel']}** ({eur(best_cpm['CPM (€)'])}).")
+    bits = []
+    if top_city_ctr is not None: bits.append(f"top CTR in **{top_city_ctr['City']}** ({pct(top_city_ctr['CTR (%)'])})")
+    if best_city_cpc is not None: bits.append(f"lowest CPC in **{best_city_cpc['City']}** ({eur(best_city_cpc['CPC (€)'])})")
+    if bits: lines.append("**By city.** " + " · ".join(bits) + ".")
+    if not winners.empty:
+        bullets = [f"- **{c}** → best channel: **{h}** ({pct(v)})"
+                   for c, h, v in zip(winners["City"], winners["Channel"], winners["CTR (%)"])]
+        lines.append("**City × channel winners:**\n" + "\n".join(bullets))
+    if hour_lines:
+        lines.append("**Best hours to schedule:**\n" + "\n".join(hour_lines))
+    tips = []
+    if best_ctr is not None and best_cpc is not None:
+        tips.append(f"Shift incremental budget to **{best_ctr['Channel']}** (highest CTR) and **{best_cpc['Channel']}** (lowest CPC) in winning cities.")
+    if not winners.empty:
+        tips.append("Scale the city–channel pairs listed above to maximize clicks at the lowest cost.")
+    tips.append("Reduce or test new creatives/targeting where CTR is low and CPC/CPM are high.")
+    lines.append("**Recommendations.** " + " ".join(tips))
+    return "\n\n".join(lines)
+
+
+def insights_for(sel_key: tuple, cells: pd.DataFrame) -> str:
+    """`text_insights_en` of `cells`, memoized per filter selection key."""
+    def build():
+        with perf.stage("narrative"):
+            return text_insights_en(cells)
+    return NARRATIVES.get_or_build(sel_key, build, version=sel_key[0])
@@ -0,0 +1,103 @@
+"""Per-rerun stage timing and cache hit/miss counters.
+
+A ``Recorder`` is bound to the current thread (Streamlit runs each rerun of a session in its
+own script thread). Code anywhere in the package can then call ``stage``/``count``; when no
+recorder is active these return immediately, so the hooks cost effectively nothing.
+"""
+import json
+import threading
+import time
+from collections import Counter
+from contextlib import nullcontext
+from datetime import datetime, timezone
+from pathlib import Path
+
+_local = threading.local()
+_NULL = nullcontext()
+_LOG_LOCK = threading.Lock()
+
+
+class Recorder:
+    """Stage durations (ms) and cache hits/misses collected during one rerun."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._last = self.started
+        self.stages = {}                 # name -> milliseconds (summed if a stage repeats)
+        self.cache = Counter()           # "<cache>.hit" / "<cache>.miss" -> count
+
+    def add(self, name: str, ms: float):
+        self.stages[name] = self.stages.get(name, 0.0) + ms
+
+    def lap(self, name: str):
+        now = time.perf_counter()
+        self.add(name, (now - self._last) * 1000)
+        self._last = now
+
+    def timed(self, name: str):
+        return _Timed(self, name)
+
+    @property
+    def total_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    def to_record(self, **context) -> dict:
+        return {
+            "ts": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            **context,
+            "total_ms": round(self.total_ms, 3),
+            "stages_ms": {k: round(v, 3) for k, v in self.stages.items()},
+            "cache": dict(self.cache),
+        }
+
+
+class _Timed:
+    __slots__ = ("rec", "name", "t0")
+
+    def __init__(self, rec: Recorder, name: str):
+        self.rec, self.name = rec, name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.rec.add(self.name, (time.perf_counter() - self.t0) * 1000)
+        return False
+
+
+def start(enabled: bool):
+    """Bind a fresh Recorder to this thread (or unbind when disabled) and return it."""
+    _local.rec = Recorder() if enabled else None
+    return _local.rec
+
+
+def current():
+    return getattr(_local, "rec", None)
+
+
+def lap(name: str):
+    """Charge the time since the previous lap (or start) to stage `name`."""
+    rec = getattr(_local, "rec", None)
+    if rec is not None:
+        rec.lap(name)
+
+
+def stage(name: str):
+    """Context manager timing the enclosed block as stage `name`."""
+    rec = getattr(_local, "rec", None)
+    return _NULL if rec is None else rec.timed(name)
+
+
+def count(cache: str, hit: bool):
+    rec = getattr(_local, "rec", None)
+    if rec is not None:
+        rec.cache[f"{cache}.{'hit' if hit else 'miss'}"] += 1
+
+
+def append_jsonl(path: Path, record: dict):
+    """Append `record` as one JSON line to `path` (created with its parent directory)."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    line = json.dumps(record, default=str) + "\n"
+    with _LOG_LOCK, open(path, "a", encoding="utf-8") as f:
+        f.write(line)
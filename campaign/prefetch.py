@@ -0,0 +1,63 @@
+"""Background prefetch of the gallery charts a session is likely to show next.
+
+Gallery navigation is sequential, so while one chart is on screen its neighbours and the
+narrative are built on a small process-wide thread pool. Results land in the shared memo
+caches (``campaign.charts.FIGURES``, ``campaign.insights.NARRATIVES``); because those caches
+are single-flight, a Prev/Next click that arrives mid-build waits for the running build
+instead of starting another one. Work queued for an old selection is cancelled.
+"""
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from campaign.charts import GalleryData, gallery_figure
+from campaign.insights import insights_for
+
+log = logging.getLogger(__name__)
+
+PREFETCH_WORKERS = int(os.environ.get("DASHBOARD_PREFETCH_WORKERS", "2"))  # 0 disables prefetching
+
+_POOL = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="prefetch") if PREFETCH_WORKERS else None
+
+
+def _run(build, what: str):
+    try:
+        build()
+    except Exception:  # a failed prefetch only means the chart is built on demand
+        log.debug("Prefetch of %s failed", what, exc_info=True)
+
+
+class Prefetcher:
+    """Per-session handle on queued prefetch work; keep one in the session state."""
+
+    def __init__(self):
+        self._key = None
+        self._futures = []
+
+    def cancel(self):
+        """Drop queued work (builds already running finish and stay cached)."""
+        for future in self._futures:
+            future.cancel()
+        self._futures = []
+
+    def retarget(self, data: GalleryData):
+        """Cancel work queued for another selection than `data`; call before building the chart on screen."""
+        if data.key != self._key:
+            self.cancel()
+            self._key = data.key
+
+    def schedule(self, data: GalleryData, gallery: list, idx: int, narrative: bool = True):
+        """Queue the narrative and the charts before and after `idx`, cancelling work for another selection."""
+        if _POOL is None:
+            return
+        self.retarget(data)
+        self._futures = [f for f in self._futures if not f.done()]
+        if narrative:
+            self._submit(lambda: insights_for(data.sel_key, data.cells), "narrative")
+        for step in (1, -1):
+            chart = gallery[(idx + step) % len(gallery)]
+            if chart is not gallery[idx]:
+                self._submit(lambda chart=chart: gallery_figure(chart, data), chart[0])
+
+    def _submit(self, build, what: str):
+        self._futures.append(_POOL.submit(_run, build, what))
@@ -0,0 +1,45 @@
+"""Weighted ratio metrics (CTR/CPC/CPM) from summed columns, and per-group winners.
+
+Ratios are always computed from sums (clicks / impressions of a group), never averaged
+row by row, and every helper is a single vectorized pass — no per-group Python callbacks.
+"""
+import numpy as np
+import pandas as pd
+
+from campaign.cube import rollup
+
+RATIO_COLS = ["CTR (%)", "CPC (€)", "CPM (€)"]
+
+
+def safe_ratio(num, den, scale: float = 1.0):
+    """``num / den * scale`` where ``den > 0``, NaN elsewhere (arrays, Series or scalars)."""
+    num = np.asarray(num, dtype="float64")
+    den = np.asarray(den, dtype="float64")
+    out = np.full(np.broadcast(num, den).shape, np.nan)
+    np.divide(num * scale, den, out=out, where=den > 0)
+    return out if out.ndim else float(out)
+
+
+def add_ratios(sums: pd.DataFrame) -> pd.DataFrame:
+    """Add CTR (%), CPC (€) and CPM (€) in place to a frame with Impressions/Clicks/Spend (€) columns."""
+    imps, clicks = sums["Impressions"], sums["Clicks"]
+    sums["CTR (%)"] = safe_ratio(clicks, imps, 100)
+    if "Spend (€)" in sums.columns:
+        sums["CPC (€)"] = safe_ratio(sums["Spend (€)"], clicks)
+        sums["CPM (€)"] = safe_ratio(sums["Spend (€)"], imps, 1000)
+    return sums
+
+
+def ratio_rollup(cells, keys) -> pd.DataFrame:
+    """Summed measures and weighted CTR/CPC/CPM of cube `cells` per `keys`, in one ``rollup`` pass."""
+    return add_ratios(rollup(cells, keys))
+
+
+def best_per_group(df: pd.DataFrame, group, metric: str, largest: bool = True) -> pd.DataFrame:
+    """The row with the highest (or lowest) `metric` in each `group`, without sorting the table.
+
+    Groups whose metric is NaN everywhere are left out; ties keep the first row.
+    """
+    valid = df.dropna(subset=[metric])
+    grouped = valid.groupby(group, observed=True, sort=True)[metric]
+    return valid.loc[grouped.idxmax() if largest else grouped.idxmin()]
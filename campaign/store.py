@@ -0,0 +1,206 @@
+"""Memory-mapped array store of the metrics cube, shared by every process on the host.
+
+The cube of a data version is written as one raw array file per column, with City and
+Channel dictionary-encoded (codes on disk, values in ``meta.json``), next to the arrays of its
+filter index. ``meta.json`` records the dtype and length of every array and is the commit
+point. Every process maps the files read-only and wraps them in a DataFrame without copying,
+so extra Streamlit workers share one copy through the page cache and a cold start costs the
+same whatever the number of rows. Rollups run on these arrays directly (``campaign.cube.rollup``).
+
+Stores of a growing source are extended in place (``append_cells``): new cells and index
+positions are written after the committed lengths and committed rows are never rewritten, so
+a process still mapping the shorter arrays keeps reading exactly the version it opened.
+"""
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from campaign import perf
+from campaign.cube import CUBE_DIMS, CUBE_MEASURES, build_cube
+from campaign.data_loader import CACHE_DIR, _cache_path, _read_enriched, _versions, source_key
+from campaign.filter_index import FilterIndex
+
+log = logging.getLogger(__name__)
+
+STORE_FORMAT = 2  # bump when the on-disk layout changes
+DICT_COLS = ["City", "Channel"]
+
+_STORES: dict = {}              # source key -> (cube, filter index) over memory-mapped arrays (process-wide)
+_LOCK = threading.Lock()
+
+
+def _file(name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_") + ".bin"   # "Spend (€)" -> spend.bin
+
+
+def _index_file(name: str) -> str:
+    return f"index.{_file(name)}"
+
+
+def _load(path: Path, dtype: str, length: int) -> np.ndarray:
+    if not length:  # empty arrays cannot be mapped
+        return np.empty(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", shape=(length,)).view(np.ndarray)  # plain view, still mapped
+
+
+def _write_array(path: Path, arr: np.ndarray, offset: int = 0):
+    """Write `arr` from element `offset` of the raw array file at `path`, dropping anything after it."""
+    with open(path, "r+b" if offset else "wb") as f:
+        f.seek(offset * arr.itemsize)
+        np.ascontiguousarray(arr).tofile(f)
+        f.truncate()  # leftovers of an interrupted append; never inside a committed length
+
+
+def _write_meta(directory: Path, meta: dict):
+    tmp = directory / f"meta.json.{os.getpid()}.{threading.get_ident()}.tmp"
+    tmp.write_text(json.dumps(meta))
+    os.replace(tmp, directory / "meta.json")
+
+
+def _cube_arrays(cube: pd.DataFrame) -> dict:
+    """On-disk arrays of `cube`: dictionary codes, days, hours and their mask, measures."""
+    arrays = {_file(col): cube[col].cat.codes.to_numpy() for col in DICT_COLS}
+    arrays[_file("Date")] = cube["Date"].to_numpy(dtype="datetime64[ns]")
+    arrays[_file("Hour")] = cube["Hour"].to_numpy(dtype=np.int8, na_value=0)
+    arrays[_file("Hour mask")] = cube["Hour"].isna().to_numpy()
+    arrays.update({_file(col): cube[col].to_numpy() for col in CUBE_MEASURES})
+    return arrays
+
+
+def write_store(cube: pd.DataFrame, index: FilterIndex, directory: Path, meta: dict = None) -> Path:
+    """Write `cube` and its filter `index` as an array store at `directory` (atomically; first writer wins)."""
+    tmp = directory.with_name(f"{directory.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.mkdir(parents=True)
+    try:
+        arrays = _cube_arrays(cube)
+        arrays.update({_index_file(name): np.asarray(arr) for name, arr in index.arrays.items()})
+        for name, arr in arrays.items():
+            _write_array(tmp / name, arr)
+        _write_meta(tmp, {
+            "format": STORE_FORMAT,
+            "rows": len(cube),
+            "arrays": {name: [arr.dtype.str, len(arr)] for name, arr in arrays.items()},
+            "dictionaries": {col: list(cube[col].cat.categories) for col in DICT_COLS},
+            "index": {"values": index.values, "arrays": list(index.arrays)},
+            **(meta or {}),
+        })
+        os.replace(tmp, directory)  # atomic rename; fails if another process already published it
+    except OSError:
+        if not (directory / "meta.json").exists():
+            raise
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return directory
+
+
+def read_meta(directory: Path) -> dict:
+    """``meta.json`` of the store at `directory`, including the caller's extra entries."""
+    return json.loads((directory / "meta.json").read_text())
+
+
+def open_store(directory: Path) -> tuple:
+    """``(cube, filter index)`` backed by the memory-mapped arrays at `directory`, without copying."""
+    meta = read_meta(directory)
+    if meta.get("format") != STORE_FORMAT:
+        raise ValueError(f"Unsupported array store format in {directory}")
+
+    def load(name):
+        return _load(directory / name, *meta["arrays"][name])
+
+    cols = {col: pd.Categorical.from_codes(load(_file(col)), categories=meta["dictionaries"][col], validate=False)
+            for col in DICT_COLS}
+    cols["Date"] = load(_file("Date"))
+    cols["Hour"] = pd.arrays.IntegerArray(load(_file("Hour")), load(_file("Hour mask")))
+    cols.update({col: load(_file(col)) for col in CUBE_MEASURES})
+    cube = pd.DataFrame({col: cols[col] for col in CUBE_DIMS + CUBE_MEASURES}, copy=False)
+    arrays = {name: load(_index_file(name)) for name in meta["index"]["arrays"]}
+    return cube, FilterIndex.from_arrays(meta["rows"], arrays, meta["index"]["values"])
+
+
+def append_cells(directory: Path, index: FilterIndex, cells: pd.DataFrame, meta: dict = None) -> bool:
+    """Append the cube `cells` to the store at `directory` (whose filter index is `index`); False to rebuild instead.
+
+    Cells and their filter index positions are written after the committed lengths; rows already
+    committed are never rewritten, so a process still mapping an older, shorter version keeps
+    reading exactly that version. A cell whose key is already stored is appended as one more
+    cell: rollups sum it with the stored one. The store has to be rebuilt when `cells` brings a
+    new City or Channel or a date before the last stored one, and once the appended cells would
+    outnumber the cells it was built with (a rebuild merges the repeated keys).
+    Callers serialize writers (e.g. with a file lock).
+    """
+    stored = read_meta(directory)
+    cells = cells.astype({col: pd.CategoricalDtype(stored["dictionaries"][col]) for col in DICT_COLS})
+    appended = stored.get("appended", 0) + len(cells)
+    tails = index.appended(cells)
+    if tails is None or appended > stored["rows"] - stored.get("appended", 0):
+        return False
+
+    arrays = _cube_arrays(cells)
+    arrays.update({_index_file(name): arr for name, arr in tails.items()})
+    for name, arr in arrays.items():
+        dtype, length = stored["arrays"][name]
+        _write_array(directory / name, arr.astype(dtype, copy=False), length)
+        stored["arrays"][name] = [dtype, length + len(arr)]
+    stored.update(meta or {}, rows=stored["rows"] + len(cells), appended=appended)
+    _write_meta(directory, stored)   # commit point
+    return True
+
+
+def store_path(key: tuple, cache_dir: Path, kind: str) -> Path:
+    """Store directory of one version (`key`) of a source; `kind` tells apart stores built differently."""
+    return _cache_path(key + (STORE_FORMAT,), cache_dir / "store").with_suffix(f".{kind}")
+
+
+def replace_versions(directory: Path, cube: pd.DataFrame, index: FilterIndex, meta: dict) -> Path:
+    """Publish the store at `directory` and delete the older versions of the same source and kind.
+
+    Processes that still map an older version keep reading it: unlinked files stay valid while mapped.
+    """
+    directory.parent.mkdir(parents=True, exist_ok=True)
+    for old in _versions(directory, directory.suffix):
+        if old != directory:
+            shutil.rmtree(old, ignore_errors=True)
+    return write_store(cube, index, directory, meta)
+
+
+def ensure_store(path: Path, cache_dir: Path = CACHE_DIR) -> Path:
+    """Directory of the array store for the current version of `path`, building it if missing."""
+    key = source_key(path)
+    directory = store_path(key, cache_dir, "cube")
+    if (directory / "meta.json").exists():
+        return directory
+    with perf.stage("ingest"):
+        cube = build_cube(_read_enriched(Path(path), key, cache_dir))
+        replace_versions(directory, cube, FilterIndex(cube), {"source": list(key)})
+    log.info("Wrote array store %s (%d cube cells)", directory, len(cube))
+    return directory
+
+
+def load_cube(path: Path, cache_dir: Path = CACHE_DIR) -> tuple:
+    """``(cube, filter index)`` of `path` from its memory-mapped array store, opened once per file version.
+
+    The returned frame is backed by read-only shared memory: treat it as read-only.
+    """
+    key = source_key(path)
+    with _LOCK:
+        entry = _STORES.get(key)
+        perf.count("stores", entry is not None)
+        if entry is None:
+            directory = ensure_store(path, cache_dir)
+            try:
+                entry = open_store(directory)
+            except (OSError, ValueError, KeyError) as e:  # corrupt store: rebuild it
+                log.warning("Rebuilding unreadable array store %s: %s", directory, e)
+                shutil.rmtree(directory, ignore_errors=True)
+                entry = open_store(ensure_store(path, cache_dir))
+            for stale in [k for k in _STORES if k[0] == key[0]]:
+                del _STORES[stale]
+            _STORES[key] = entry
+    return entry
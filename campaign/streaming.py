@@ -0,0 +1,140 @@
+"""Streaming ingestion for CSVs larger than memory.
+
+The CSV is read in bounded chunks; each chunk is validated, coerced and reduced straight into
+the additive metrics cube, so peak memory depends on the chunk size and the number of cube
+cells, never on the file size. Malformed values are counted per column and their rows dropped
+instead of silently becoming NaN.
+"""
+import logging
+import shutil
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import pandas as pd
+
+from campaign import perf
+from campaign.cube import build_cube, merge_cubes
+from campaign.data_loader import CACHE_DIR, REQUIRED_COLS, apply_schema, ensure_metrics, source_key
+from campaign.filter_index import FilterIndex
+from campaign.store import open_store, read_meta, replace_versions, store_path
+
+log = logging.getLogger(__name__)
+
+CHUNK_ROWS = 500_000
+FOLD_EVERY = 8                  # chunk cubes merged into the running cube every N chunks
+NUMERIC_COLS = ["Impressions", "Clicks", "Spend (€)"]
+USE_COLS = REQUIRED_COLS | {"Hour"}
+
+_STREAMED: dict = {}            # source key -> (cube, filter index, report) (process-wide)
+_LOCK = threading.Lock()
+
+
+@dataclass
+class IngestReport:
+    """Row counts of a streaming ingest; `malformed` counts dropped rows per offending column."""
+    rows_read: int = 0
+    rows_kept: int = 0
+    chunks: int = 0
+    malformed: Counter = field(default_factory=Counter)
+
+    @property
+    def rows_dropped(self) -> int:
+        return self.rows_read - self.rows_kept
+
+    def summary(self) -> str:
+        bad = ", ".join(f"{col}: {n:,}" for col, n in self.malformed.most_common()) or "none"
+        return (f"{self.rows_read:,} rows in {self.chunks} chunks, {self.rows_kept:,} kept, "
+                f"{self.rows_dropped:,} dropped (malformed — {bad})")
+
+    def to_dict(self) -> dict:
+        return {"rows_read": self.rows_read, "rows_kept": self.rows_kept, "chunks": self.chunks,
+                "malformed": dict(self.malformed)}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "IngestReport":
+        return cls(d["rows_read"], d["rows_kept"], d["chunks"], Counter(d["malformed"]))
+
+
+def clean_chunk(raw: pd.DataFrame, report: IngestReport) -> pd.DataFrame:
+    """Coerce one chunk read as strings; drop and count rows with malformed values."""
+    bad = pd.Series(False, index=raw.index)
+
+    def flag(col: str, invalid: pd.Series):
+        nonlocal bad
+        invalid = invalid & ~bad          # each dropped row is counted once, on its first bad column
+        if invalid.any():
+            report.malformed[col] += int(invalid.sum())
+            bad |= invalid
+
+    out = pd.DataFrame(index=raw.index)
+    out["Date"] = pd.to_datetime(raw["Date"], errors="coerce")
+    flag("Date", out["Date"].isna())
+    for col in ("City", "Channel"):
+        out[col] = raw[col].str.strip()
+        flag(col, out[col].isna() | (out[col] == ""))
+    for col in NUMERIC_COLS:
+        out[col] = pd.to_numeric(raw[col], errors="coerce")
+        flag(col, out[col].isna() | (out[col] < 0))
+    if "Hour" in raw.columns:  # optional column: empty is fine, garbage or out of range is not
+        hour = pd.to_numeric(raw["Hour"], errors="coerce")
+        flag("Hour", raw["Hour"].notna() & (hour.isna() | (hour < 0) | (hour > 23) | (hour % 1 != 0)))
+        out["Hour"] = hour
+    return out.loc[~bad]
+
+
+def stream_cube(path: Path, chunk_rows: int = CHUNK_ROWS) -> tuple:
+    """Reduce the CSV at `path` to ``(cube, IngestReport)`` reading `chunk_rows` rows at a time."""
+    report, cube, pending = IngestReport(), None, []
+    reader = pd.read_csv(path, chunksize=chunk_rows, dtype=str, usecols=lambda c: c in USE_COLS)
+    with reader:
+        for raw in reader:
+            if report.chunks == 0:
+                miss = REQUIRED_COLS - set(raw.columns)
+                if miss:
+                    raise ValueError(f"Missing required columns: {miss}")
+            report.chunks += 1
+            report.rows_read += len(raw)
+            rows = clean_chunk(raw, report)
+            report.rows_kept += len(rows)
+            if not rows.empty:
+                pending.append(build_cube(apply_schema(ensure_metrics(rows))))
+            if len(pending) >= FOLD_EVERY:
+                cube = merge_cubes(*([cube] if cube is not None else []), *pending)
+                pending = []
+    if pending:
+        cube = merge_cubes(*([cube] if cube is not None else []), *pending)
+    if cube is None:
+        raise ValueError(f"No valid rows in {path} ({report.summary()})")
+    if report.rows_dropped:
+        log.warning("Streaming ingest of %s: %s", path, report.summary())
+    return cube, report
+
+
+def load_cube_streaming(path: Path, cache_dir: Path = CACHE_DIR, chunk_rows: int = CHUNK_ROWS) -> tuple:
+    """``(cube, filter index, IngestReport)`` for a large CSV, streamed once per file version.
+
+    The cube is published as a memory-mapped array store (``campaign.store``) with the report in
+    its metadata, so restarts skip the stream and every worker process shares one copy.
+    """
+    key = source_key(path)
+    with _LOCK:
+        entry = _STREAMED.get(key)
+        perf.count("streamed", entry is not None)
+        if entry is None:
+            directory = store_path(key, cache_dir, "stream")
+            try:
+                cube, index = open_store(directory)
+                report = IngestReport.from_dict(read_meta(directory)["report"])
+            except (OSError, ValueError, KeyError):
+                with perf.stage("ingest"):
+                    cube, report = stream_cube(Path(path), chunk_rows)
+                    shutil.rmtree(directory, ignore_errors=True)
+                    replace_versions(directory, cube, FilterIndex(cube), {"source": list(key), "report": report.to_dict()})
+                cube, index = open_store(directory)  # drop the private copy, map the shared one
+            entry = (cube, index, report)
+            for stale in [k for k in _STREAMED if k[0] == key[0]]:
+                del _STREAMED[stale]
+            _STREAMED[key] = entry
+    return entry
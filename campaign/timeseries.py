@@ -0,0 +1,97 @@
+"""Channel time series: bucket cube cells per period and smooth them, fully vectorized.
+
+``RollingSeries`` keeps prefix sums of the dense Channel × period grid, so once it is built
+for a filter selection and granularity any rolling window is an O(n) array difference.
+"""
+import numpy as np
+import pandas as pd
+
+from campaign.cube import rollup
+from campaign.ratios import safe_ratio
+
+FREQ = {"Daily": "D", "Weekly": "W-MON", "Monthly": "MS"}
+SUM_COLS = ["Impressions", "Clicks", "Spend (€)"]
+SMOOTH_COLS = ["Impressions", "Clicks", "CTR (%)", "CPC (€)"]
+PERIOD_DAYS = {"Daily": 1, "Weekly": 7, "Monthly": 30}
+PERIOD_UNIT = {"Daily": "day", "Weekly": "week", "Monthly": "month"}
+
+
+def period_label(dates: pd.Series, how: str) -> pd.Series:
+    """Bucket label of each date, identical to the labels of ``resample(FREQ[how])``."""
+    dates = dates.dt.normalize()
+    if how == "Daily":
+        return dates
+    if how == "Weekly":  # W-MON bins close on Monday and are labelled by it
+        return dates + pd.to_timedelta((-dates.dt.weekday) % 7, unit="D")
+    if how == "Monthly":
+        return dates.dt.to_period("M").dt.start_time
+    raise ValueError(f"Unknown granularity: {how!r}")
+
+
+def period_grid(cells: pd.DataFrame, how: str) -> pd.DataFrame:
+    """Summed measures on a dense Channel × period grid (zero-filled, per-channel span)."""
+    daily = rollup(cells, ["Channel", "Date"])
+    if daily.empty:
+        return pd.DataFrame(columns=["Channel", "Date"] + SUM_COLS)
+    daily["Date"] = period_label(daily["Date"], how)
+    per = daily.groupby(["Channel", "Date"], observed=True, sort=True)[SUM_COLS].sum()
+
+    span = per.index.to_frame(index=False).groupby("Channel", observed=True, sort=True)["Date"].agg(["min", "max"])
+    periods = pd.date_range(span["min"].min(), span["max"].max(), freq=FREQ[how])
+    grid = pd.MultiIndex.from_product([span.index, periods], names=["Channel", "Date"])
+    out = per.reindex(grid, fill_value=0).reset_index()
+
+    # Same timeline resample() gives each channel: from its first to its last period
+    ch_pos = np.repeat(np.arange(len(span)), len(periods))
+    d = out["Date"].to_numpy()
+    keep = (d >= span["min"].to_numpy()[ch_pos]) & (d <= span["max"].to_numpy()[ch_pos])
+    return out.loc[keep].reset_index(drop=True)
+
+
+def window_periods(how: str, days: int) -> int:
+    """Rolling window in periods of `how` closest to `days` (at least one period)."""
+    return max(1, round(days / PERIOD_DAYS[how]))
+
+
+def rolling_label(how: str, periods: int) -> str:
+    """Chart subtitle such as "Daily + 7-day rolling"."""
+    return how if periods <= 1 else f"{how} + {periods}-{PERIOD_UNIT[how]} rolling"
+
+
+class RollingSeries:
+    """Per-period Channel series with prefix sums for O(n) rolling means of any window."""
+
+    def __init__(self, grid: pd.DataFrame):
+        grid = grid.copy()
+        grid["CTR (%)"] = safe_ratio(grid["Clicks"], grid["Impressions"], 100)
+        grid["CPC (€)"] = safe_ratio(grid["Spend (€)"], grid["Clicks"])
+        self.grid = grid
+        n = len(grid)
+        # Channels are contiguous blocks of the grid: start position of each row's block
+        ch = grid["Channel"].to_numpy()
+        new_block = np.ones(n, dtype=bool)
+        new_block[1:] = ch[1:] != ch[:-1]
+        self._block_start = np.maximum.accumulate(np.where(new_block, np.arange(n), 0))
+        # Prefix sums with a leading zero; NaN ratios are skipped, as rolling().mean() does
+        vals = grid[SMOOTH_COLS].to_numpy(dtype="float64")
+        valid = ~np.isnan(vals)
+        zero = np.zeros((1, vals.shape[1]))
+        self._csum = np.vstack([zero, np.cumsum(np.where(valid, vals, 0.0), axis=0)])
+        self._ccount = np.vstack([zero, np.cumsum(valid, axis=0)])
+
+    @classmethod
+    def from_cells(cls, cells: pd.DataFrame, how: str) -> "RollingSeries":
+        return cls(period_grid(cells, how))
+
+    def frame(self, window: int = 1) -> pd.DataFrame:
+        """The grid with SMOOTH_COLS replaced by their trailing `window`-period mean (min_periods=1)."""
+        out = self.grid.copy()
+        if window <= 1 or out.empty:
+            return out
+        hi = np.arange(1, len(out) + 1)
+        lo = np.maximum(hi - window, self._block_start)
+        total = self._csum[hi] - self._csum[lo]
+        count = self._ccount[hi] - self._ccount[lo]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out[SMOOTH_COLS] = np.where(count > 0, total / count, np.nan)
+        return out
@@ -0,0 +1,49 @@
+import os
+
+from campaign.data_loader import load_memory_report
+from campaign.store import ensure_store
+from campaign.streaming import load_cube_streaming
+
+CSV = ("Date,City,Channel,Hour,Impressions,Clicks,Spend (€),CTR (%),CPC (€)\n"
+       "2025-01-01,Paris,TikTok,9,1000,30,12.5,3.0,0.4167\n"
+       "2025-01-02,Lyon,YouTube,10,800,10,4.0,1.25,0.4\n")
+
+
+def test_column_cache_and_stores_do_not_delete_each_other(tmp_path):
+    path, cache = tmp_path / "campaign.csv", tmp_path / "cache"
+    path.write_text(CSV)
+    cache.mkdir()
+    in_flight = cache / "campaign-01234567-0123456789abcdef.4242.tmp"  # another worker's column cache being written
+    in_flight.write_bytes(b"")
+
+    load_cube_streaming(path, cache)
+    store = ensure_store(path, cache)
+    stream = next((cache / "store").glob("*.stream"))
+    assert load_memory_report(path, cache) is not None and stream.exists() and in_flight.exists()
+
+    path.write_text(CSV + "2025-01-03,Paris,TikTok,11,500,5,2.5,1.0,0.5\n")
+    os.utime(path, ns=(0, 10**18))  # a new version even within the mtime resolution
+    new_store = ensure_store(path, cache)
+    assert load_memory_report(path, cache) is not None
+    assert len(list(cache.glob("*.parquet"))) == 1 and len(list(cache.glob("*.memory.json"))) == 1
+    assert not store.exists() and new_store.exists() and stream.exists()  # only its own older version goes
+
+    load_cube_streaming(path, cache)
+    assert not stream.exists() and new_store.exists() and load_memory_report(path, cache) is not None
+
+
+def test_sources_sharing_a_name_prefix_keep_their_caches(tmp_path):
+    cache = tmp_path / "cache"
+    sales, sales_eu = tmp_path / "sales.csv", tmp_path / "sales-eu.csv"
+    sales.write_text(CSV)
+    sales_eu.write_text(CSV)
+
+    load_cube_streaming(sales_eu, cache)
+    eu_stream = next((cache / "store").glob("*.stream"))
+    eu_store = ensure_store(sales_eu, cache)
+    load_cube_streaming(sales, cache)
+    ensure_store(sales, cache)
+    assert eu_stream.exists() and eu_store.exists()
+    assert len(list((cache / "store").glob("*.cube"))) == 2 and len(list((cache / "store").glob("*.stream"))) == 2
+    assert len(list(cache.glob("*.parquet"))) == 2 and len(list(cache.glob("*.memory.json"))) == 2
+    assert load_memory_report(sales_eu, cache) is not None and load_memory_report(sales, cache) is not None
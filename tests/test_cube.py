@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+
+from campaign.cube import CUBE_MEASURES, CubeSlice, build_cube, rollup, slice_cube, totals
+from campaign.data_loader import apply_schema, ensure_metrics
+from campaign.filter_index import FilterIndex
+
+
+def _cube() -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    n = 400
+    rows = pd.DataFrame({
+        "Date": pd.Timestamp("2025-01-01") + pd.to_timedelta(rng.integers(0, 20, n), unit="D"),
+        "City": rng.choice(["Paris", "Lyon", "Nice"], n),
+        "Channel": rng.choice(["TikTok", "YouTube"], n),
+        "Hour": pd.array(np.where(rng.random(n) < 0.1, -1, rng.integers(0, 24, n)), dtype="Int64"),
+        "Impressions": rng.integers(100, 1000, n),
+        "Clicks": rng.integers(0, 50, n),
+        "Spend (€)": rng.random(n) * 20,
+    })
+    rows["Hour"] = rows["Hour"].mask(rows["Hour"] < 0)
+    return build_cube(apply_schema(ensure_metrics(rows)))
+
+
+def test_rollup_at_positions_matches_groupby_of_the_rows():
+    cube = _cube()
+    cells = slice_cube(cube, FilterIndex(cube), ["TikTok"], ["Paris", "Nice"], ("2025-01-05", "2025-01-12"))
+    assert isinstance(cells, CubeSlice) and 0 < len(cells) < len(cube)
+    frame = cells.frame()
+    for keys, dropna in ((["City"], True), (["Channel", "Date"], True), (["City", "Channel", "Hour"], False)):
+        want = frame.groupby(keys, dropna=dropna, observed=True, sort=True)[CUBE_MEASURES].sum().reset_index()
+        pd.testing.assert_frame_equal(rollup(cells, keys, dropna=dropna), want, check_dtype=False,
+                                      check_categorical=False)
+        pd.testing.assert_frame_equal(rollup(cube, keys, dropna=dropna, rows=cells.rows),
+                                      rollup(cells, keys, dropna=dropna))
+    pd.testing.assert_series_equal(totals(cells), totals(frame))
+    pd.testing.assert_series_equal(cells["Date"], frame["Date"].reset_index(drop=True))
+
+
+def test_whole_cube_slice_is_not_copied():
+    cube = _cube()
+    cells = slice_cube(cube, FilterIndex(cube), ["TikTok", "YouTube"], ["Paris", "Lyon", "Nice"])
+    assert cells.rows is None and cells.frame() is cube and cells["Clicks"] is cube["Clicks"]
+    assert slice_cube(cube, FilterIndex(cube), [], ["Paris"]).empty
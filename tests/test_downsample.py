@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+from campaign.downsample import downsample, lttb
+
+
+def _series(channels: dict) -> pd.DataFrame:
+    """Daily frame with `n` rows per channel, keyed by channel name."""
+    parts = [pd.DataFrame({"Channel": ch, "Date": pd.date_range("2025-01-01", periods=n, freq="D"),
+                           "Clicks": np.arange(n, dtype="float64")})
+             for ch, n in channels.items()]
+    return pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(
+        {"Channel": pd.Series(dtype=object), "Date": pd.Series(dtype="datetime64[ns]"), "Clicks": pd.Series(dtype="float64")})
+
+
+def test_empty_frame_is_returned_unchanged():
+    empty = _series({})
+    assert downsample(empty, "Date", "Clicks", by="Channel", max_points=10) is empty
+
+
+def test_empty_categorical_groups_are_returned_unchanged():
+    empty = _series({}).astype({"Channel": pd.CategoricalDtype(["TikTok", "YouTube"])})
+    assert downsample(empty, "Date", "Clicks", by="Channel", max_points=10).empty
+
+
+def test_short_series_are_kept_whole():
+    frame = _series({"TikTok": 1, "YouTube": 5})
+    assert downsample(frame, "Date", "Clicks", by="Channel", max_points=10) is frame
+
+
+def test_long_series_are_capped_per_group():
+    frame = _series({"TikTok": 500, "YouTube": 3})
+    out = downsample(frame, "Date", "Clicks", by="Channel", max_points=50)
+    counts = out.groupby("Channel").size()
+    assert counts["TikTok"] == 50 and counts["YouTube"] == 3
+    tiktok = out[out["Channel"] == "TikTok"]
+    assert tiktok["Date"].is_monotonic_increasing
+    assert tiktok["Date"].iloc[0] == frame["Date"].min() and tiktok["Date"].iloc[-1] == frame["Date"].max()
+
+
+def test_lttb_keeps_endpoints_and_order():
+    y = np.sin(np.linspace(0, 20, 1000))
+    y[100:200] = np.nan
+    idx = lttb(np.arange(1000), y, 100)
+    assert len(idx) == 100 and idx[0] == 0 and idx[-1] == 999
+    assert (np.diff(idx) > 0).all()
+
+
+def test_lttb_short_input_is_kept_whole():
+    for n in (0, 1, 2, 3):
+        assert list(lttb(np.arange(n), np.zeros(n), 10)) == list(range(n))
@@ -0,0 +1,172 @@
+import numpy as np
+import pandas as pd
+
+from campaign.cube import CUBE_DIMS, build_cube, rollup, slice_cube, totals
+from campaign.data_loader import apply_schema, ensure_metrics
+from campaign.filter_index import FilterIndex
+from campaign.incremental import IncrementalDataset
+from campaign.store import open_store
+
+HEADER = "Date,City,Channel,Hour,Impressions,Clicks,Spend (€),CTR (%),CPC (€)\n"
+
+
+def _line(date, city, channel, hour, impressions, clicks, spend) -> str:
+    return f"{date},{city},{channel},{hour},{impressions},{clicks},{spend},{100 * clicks / impressions},{spend / clicks}\n"
+
+
+def _cells(cube: pd.DataFrame) -> pd.DataFrame:
+    """`cube` in a canonical row order with plain string dimensions, for comparisons."""
+    cube = cube.astype({"City": str, "Channel": str})
+    return cube.sort_values(CUBE_DIMS).reset_index(drop=True)
+
+
+def _summed(cube: pd.DataFrame) -> pd.DataFrame:
+    """Canonical cells of `cube` with repeated cells summed, as every rollup sees them."""
+    return _cells(rollup(cube, CUBE_DIMS, dropna=False))
+
+
+def _expected(*paths) -> pd.DataFrame:
+    rows = pd.concat([pd.read_csv(p, parse_dates=["Date"]) for p in paths], ignore_index=True)
+    return _cells(build_cube(apply_schema(ensure_metrics(rows))))
+
+
+def _dataset(tmp_path):
+    data = tmp_path / "data"
+    data.mkdir()
+    return data, IncrementalDataset(data, state_dir=tmp_path / "state")
+
+
+def test_partial_last_line_waits_for_its_newline(tmp_path):
+    data, ds = _dataset(tmp_path)
+    path = data / "a.csv"
+    last = _line("2025-01-02", "Paris", "TikTok", 10, 500, 20, 9.5)
+    path.write_text(HEADER + _line("2025-01-01", "Paris", "TikTok", 9, 1000, 30, 12.5) + last[:12])
+
+    assert ds.refresh() == 1
+    path.write_text(path.read_text() + last[12:])
+    assert ds.refresh() == 1
+    assert ds.refresh() == 0
+    pd.testing.assert_frame_equal(_summed(ds.snapshot()[0]), _expected(path), check_dtype=False)
+
+
+def test_appends_extend_the_store_and_its_index(tmp_path):
+    data, ds = _dataset(tmp_path)
+    path = data / "a.csv"
+    path.write_text(HEADER + _line("2025-01-01", "Paris", "TikTok", 9, 1000, 30, 12.5)
+                    + _line("2025-01-01", "Lyon", "YouTube", 9, 800, 10, 4.0)
+                    + _line("2025-01-01", "Lyon", "TikTok", 10, 600, 6, 3.0)
+                    + _line("2025-01-01", "Paris", "YouTube", 10, 400, 4, 2.0))
+    ds.refresh()
+    store = ds.manifest["store"]
+
+    with open(path, "a") as f:  # same cell again, a new hour of the same day, and a new day
+        f.write(_line("2025-01-01", "Paris", "TikTok", 9, 500, 5, 2.5)
+                + _line("2025-01-01", "Lyon", "TikTok", 11, 300, 3, 1.0)
+                + _line("2025-01-02", "Paris", "YouTube", 8, 700, 7, 3.5))
+    assert ds.refresh() == 3
+
+    cube, index, version = ds.snapshot()
+    assert ds.manifest["store"] == store           # extended, not rebuilt
+    assert version == (str(data.resolve()), 2)
+    assert len(cube) == 7                          # the repeated cell is appended, and summed by rollups
+    pd.testing.assert_frame_equal(_summed(cube), _expected(path), check_dtype=False)
+
+    rebuilt = FilterIndex(cube)
+    for dates in (None, ("2025-01-02", "2025-01-02"), ("2025-01-01", "2025-01-01")):
+        for channels in (["TikTok"], ["TikTok", "YouTube"]):
+            got = index.select(dates, Channel=channels, City=["Paris"])
+            want = rebuilt.select(dates, Channel=channels, City=["Paris"])
+            np.testing.assert_array_equal(np.sort(got), np.sort(want))
+    assert index.span == rebuilt.span
+
+
+def test_older_snapshots_keep_the_totals_of_their_generation(tmp_path):
+    data, ds = _dataset(tmp_path)
+    path = data / "a.csv"
+    path.write_text(HEADER + _line("2025-01-01", "Paris", "TikTok", 9, 1000, 30, 12.5)
+                    + _line("2025-01-01", "Lyon", "YouTube", 9, 800, 10, 4.0))
+    ds.refresh()
+    old_cube, old_index, old_version = ds.snapshot()
+    mapped, _ = open_store(ds.store_dir)           # what another worker process has mapped
+
+    with open(path, "a") as f:
+        f.write(_line("2025-01-01", "Paris", "TikTok", 9, 7, 1, 0.5))
+    ds.refresh()
+
+    for cube in (old_cube, mapped):
+        assert totals(cube)["Impressions"] == 1800
+        paris = rollup(slice_cube(cube, old_index, ["TikTok"], ["Paris"]), ["City"])
+        assert paris["Impressions"].tolist() == [1000]
+    cube, index, version = ds.snapshot()
+    assert version != old_version and totals(cube)["Impressions"] == 1807
+    assert rollup(slice_cube(cube, index, ["TikTok"], ["Paris"]), ["City"])["Impressions"].tolist() == [1007]
+
+
+def test_rebuild_merges_repeated_cells_once_appends_outnumber_the_store(tmp_path):
+    data, ds = _dataset(tmp_path)
+    path = data / "a.csv"
+    path.write_text(HEADER + _line("2025-01-01", "Paris", "TikTok", 9, 1000, 30, 12.5))
+    ds.refresh()
+    stores = {ds.manifest["store"]}
+    for _ in range(4):
+        with open(path, "a") as f:
+            f.write(_line("2025-01-01", "Paris", "TikTok", 9, 100, 1, 1.0))
+        ds.refresh()
+        stores.add(ds.manifest["store"])
+
+    cube = ds.snapshot()[0]
+    assert len(stores) > 1 and len(cube) <= 2
+    pd.testing.assert_frame_equal(_summed(cube), _expected(path), check_dtype=False)
+
+
+def test_new_city_or_back_dated_rows_rebuild_the_store(tmp_path):
+    data, ds = _dataset(tmp_path)
+    path = data / "a.csv"
+    path.write_text(HEADER + _line("2025-01-02", "Paris", "TikTok", 9, 1000, 30, 12.5))
+    ds.refresh()
+    store = ds.manifest["store"]
+
+    with open(path, "a") as f:
+        f.write(_line("2025-01-02", "Nice", "TikTok", 9, 400, 4, 2.0))
+    ds.refresh()
+    assert ds.manifest["store"] != store
+    store = ds.manifest["store"]
+
+    with open(path, "a") as f:
+        f.write(_line("2025-01-01", "Paris", "TikTok", 9, 400, 4, 2.0))
+    ds.refresh()
+    assert ds.manifest["store"] != store
+    assert not (tmp_path / "state" / store).exists()
+    pd.testing.assert_frame_equal(_summed(ds.snapshot()[0]), _expected(path), check_dtype=False)
+
+
+def test_truncated_file_resets_the_dataset(tmp_path):
+    data, ds = _dataset(tmp_path)
+    path = data / "a.csv"
+    path.write_text(HEADER + _line("2025-01-01", "Paris", "TikTok", 9, 1000, 30, 12.5)
+                    + _line("2025-01-02", "Paris", "TikTok", 9, 900, 20, 10.0))
+    ds.refresh()
+    _, _, before = ds.snapshot()
+
+    path.write_text(HEADER + _line("2025-02-01", "Lyon", "YouTube", 9, 100, 1, 0.5))
+    assert ds.refresh() == 1
+    _, _, after = ds.snapshot()
+    assert after != before
+    assert ds.manifest["parts"] == [f"part-{after[1]:06d}.parquet"]
+    pd.testing.assert_frame_equal(_summed(ds.snapshot()[0]), _expected(path), check_dtype=False)
+    assert len(ds.frame()) == 1
+
+
+def test_restart_maps_the_committed_store_without_rereading(tmp_path):
+    data, ds = _dataset(tmp_path)
+    path = data / "a.csv"
+    path.write_text(HEADER + _line("2025-01-01", "Paris", "TikTok", 9, 1000, 30, 12.5))
+    ds.refresh()
+    with open(path, "a") as f:
+        f.write(_line("2025-01-01", "Paris", "TikTok", 9, 500, 5, 2.5))
+    ds.refresh()
+
+    again = IncrementalDataset(data, state_dir=tmp_path / "state")
+    assert again.refresh() == 0
+    assert again.snapshot()[2] == ds.snapshot()[2]
+    pd.testing.assert_frame_equal(_summed(again.snapshot()[0]), _expected(path), check_dtype=False)
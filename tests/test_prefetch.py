@@ -0,0 +1,17 @@
+from concurrent.futures import Future
+
+import pandas as pd
+
+from campaign.charts import GalleryData
+from campaign.prefetch import Prefetcher
+
+
+def test_retarget_cancels_work_queued_for_another_selection():
+    prefetcher, old, new = Prefetcher(), GalleryData(pd.DataFrame(), ("old",)), GalleryData(pd.DataFrame(), ("new",))
+    prefetcher.retarget(old)
+    queued = prefetcher._futures = [Future(), Future()]
+
+    prefetcher.retarget(old)
+    assert not any(f.cancelled() for f in queued)
+    prefetcher.retarget(new)
+    assert all(f.cancelled() for f in queued) and prefetcher._futures == []